@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome书签分类器性能基准
+用合成书签数据对比各实现的吞吐量，并校验结果一致；
+pipeline 子命令生成合成的Chrome导出文件，分阶段计时并把结果写入JSON，便于跨提交对比
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bookmark_classifier import BookmarkClassifier, BookmarkParser, FastBookmarkParser, HTMLGenerator
+from profiler import current_rss_kb, peak_rss_kb
+from chrome_bookmarks import ChromeBookmarksReader, unix_to_webkit
+from bookmark_record import Bookmark, PathInterner
+from bookmark_dedup import BookmarkDeduplicator
+from bookmark_snapshot import BookmarkSnapshot, write_snapshot
+
+
+# 合成数据用到的常见域名和标题词
+HOSTS = [
+    'github.com', 'www.youtube.com', 'www.zhihu.com', 'stackoverflow.com',
+    'www.bilibili.com', 'docs.python.org', 'developer.mozilla.org',
+    'news.ycombinator.com', 'www.amazon.com', 'item.jd.com', 'mail.google.com',
+    'www.reddit.com', 'twitter.com', 'www.linkedin.com', 'example.org',
+    'blog.csdn.net', 'unrealengine.com', 'store.steampowered.com',
+]
+WORDS = [
+    'python', 'tutorial', 'react', 'docker', 'linux', 'video', 'mail',
+    'design', 'figma', 'shader', 'bitcoin', 'job', 'career', 'news',
+    'recipe', 'travel', 'weather', 'music', 'finance', 'blog', 'notes',
+    '教程', '视频教程', '前端', '招聘', '设计', '新闻', '购物', '社区',
+]
+
+
+def make_synthetic_bookmarks(count, seed=0):
+    """生成 count 个与 BookmarkParser 输出相同类型的合成书签"""
+    rng = random.Random(seed)
+    intern_path = PathInterner()
+    bookmarks = []
+    for i in range(count):
+        host = rng.choice(HOSTS)
+        path = '/'.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+        bookmarks.append(Bookmark(
+            f'https://{host}/{path}?id={i}',
+            name.title(),
+            str(1600000000 + i),
+            intern_path(('Bookmarks bar', rng.choice(WORDS))),
+        ))
+    return bookmarks
+
+
+# 含有短关键词子串但与分类无关的常见词（'ai' in 'mail'，'ux' in 'linux' 等），子串引擎会误报
+TRICKY_WORDS = [
+    'mail', 'email', 'detail', 'again', 'domain', 'train', 'build', 'guide',
+    'device', 'special', 'respect', 'method', 'together', 'pipeline', 'unless',
+    'wireless', 'blue', 'queue', 'recipe', 'weather', 'travel', 'family',
+]
+# 普通填充词（运行时再过滤掉任一引擎会命中的词）
+FILLER_WORDS = [
+    'home', 'page', 'index', 'read', 'later', 'list', 'my', 'the', 'best', 'top', 'new',
+    'old', 'how', 'to', 'for', 'with', 'and', 'ideas', 'saved', 'link', 'misc', '收藏', '杂项',
+]
+NEUTRAL_HOSTS = ['example.org', 'www.example.com', 'files.home.arpa', 'my.site.net']
+# 与关键词拼接成更长主机名的前后缀（如 raw.githubusercontent.com），同样运行时过滤
+HOST_AFFIXES = ['usercontent', 'static', 'cdn', 'hq', 'land', 'zone', 'mirror', 'files']
+
+# 标注样本的类型：
+#   word      关键词作为完整单词出现，其余为普通填充词
+#   embedded  关键词只出现在更长的主机名中（分词引擎会漏掉）
+#   tricky    关键词作为完整单词出现，同时夹杂含有短关键词子串的词（子串引擎会误判）
+#   other     不含关键词，填充词中一半是易误报的词，标注为 Other
+SAMPLE_KINDS = (('word', 0.4), ('embedded', 0.2), ('tricky', 0.2), ('other', 0.2))
+
+
+def make_labeled_bookmarks(count, seed=0):
+    """
+    生成带标注的合成书签，返回 [(书签, 标注分类, 样本类型)]（类型见 SAMPLE_KINDS）
+    关键词只取两种引擎单独匹配时都归入同一分类的，标注不偏向任何一种引擎；
+    embedded 与 tricky 两类分别对分词引擎和子串引擎不利，按类型分别统计才能看出各自的取舍
+    """
+    rng = random.Random(seed)
+    substring = BookmarkClassifier(engine='substring')
+    token = BookmarkClassifier(engine='token')
+
+    def label_of(name, url=''):
+        """两种引擎一致时返回该分类，否则返回 None"""
+        probe = Bookmark(url, name)
+        category = substring.classify_bookmark(probe)
+        return category if token.classify_bookmark(probe) == category else None
+
+    planted = [(category, keyword)
+               for category, keywords in BookmarkClassifier.CATEGORIES.items()
+               for keyword in keywords if label_of(keyword) == category]
+    # 可以拼进主机名的关键词：纯小写字母数字，且单独作为主机标签时两种引擎都归入本分类
+    hostable = [(category, keyword) for category, keyword in planted
+                if keyword.isascii() and keyword.isalnum()
+                and label_of('', f'https://{keyword}.com/') == category]
+    fillers = [w for w in FILLER_WORDS if label_of(w) == 'Other']
+    affixes = [a for a in HOST_AFFIXES if label_of('', f'https://{a}.com/') == 'Other']
+
+    kinds, weights = zip(*SAMPLE_KINDS)
+    samples = []
+    for i in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        pool = TRICKY_WORDS if kind == 'tricky' else fillers
+        words = [rng.choice(pool) for _ in range(rng.randint(1, 4))]
+        host = rng.choice(NEUTRAL_HOSTS)
+        if kind in ('word', 'tricky'):
+            label, keyword = rng.choice(planted)
+            words.insert(rng.randint(0, len(words)), keyword)
+        elif kind == 'embedded':
+            label, keyword = rng.choice(hostable)
+            affix = rng.choice(affixes)
+            host = f'raw.{keyword}{affix}.com' if rng.random() < 0.5 else f'{affix}{keyword}.net'
+        else:
+            label = 'Other'
+            words = [rng.choice(TRICKY_WORDS if rng.random() < 0.5 else fillers) for _ in words]
+        path = '/'.join(rng.choice(fillers) for _ in range(rng.randint(0, 3)))
+        bookmark = Bookmark(f'https://{host}/{path}', ' '.join(words), str(1600000000 + i))
+        samples.append((bookmark, label, kind))
+    return samples
+
+
+# 合成导出文件的文件夹名（中英混合，含需要转义的字符）
+FOLDER_NAMES = [
+    'Bookmarks bar', 'Other bookmarks', 'Dev', 'Reading & Notes', '工作', '学习资料',
+    '收藏夹', 'Tools', '视频', '临时', 'Archive 2019', 'AI 论文', '购物清单',
+]
+
+
+def write_synthetic_export(path, count, seed=0, icon_ratio=0.3, icon_bytes=(200, 4000)):
+    """
+    生成Netscape格式的合成Chrome书签导出文件（边生成边写入）
+    包含多层文件夹嵌套、中文名称、HTML实体，以及一定比例的大体积 ICON data URI
+    """
+    rng = random.Random(seed)
+    icon_pool = [
+        base64.b64encode(rng.randbytes(rng.randint(*icon_bytes))).decode('ascii')
+        for _ in range(64)
+    ]
+
+    with open(path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        f.write('''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+''')
+        depth = 0
+        for i in range(count):
+            # 随机进入或退出文件夹，深度不超过5层
+            if depth < 5 and rng.random() < 0.02:
+                folder = rng.choice(FOLDER_NAMES).replace('&', '&amp;')
+                f.write(f'{"    " * (depth + 1)}<DT><H3 ADD_DATE="{1500000000 + i}">{folder}</H3>\n')
+                f.write(f'{"    " * (depth + 1)}<DL><p>\n')
+                depth += 1
+            elif depth > 0 and rng.random() < 0.02:
+                f.write(f'{"    " * depth}</DL><p>\n')
+                depth -= 1
+
+            host = rng.choice(HOSTS)
+            path_part = '/'.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))).title()
+            if rng.random() < 0.1:
+                name += ' &amp; more'
+            icon = ''
+            if rng.random() < icon_ratio:
+                icon = f' ICON="data:image/png;base64,{rng.choice(icon_pool)}"'
+            f.write(f'{"    " * (depth + 1)}<DT><A HREF="https://{host}/{path_part}?id={i}&amp;ref=bench" '
+                    f'ADD_DATE="{1600000000 + i}"{icon}>{name}</A>\n')
+
+        while depth > 0:
+            f.write(f'{"    " * depth}</DL><p>\n')
+            depth -= 1
+        f.write('</DL><p>\n')
+
+
+def write_chrome_json(path, bookmarks):
+    """
+    将解析出的书签按 folder_path 还原成 Chrome Bookmarks JSON 文件
+    顶层书签放入“其他书签”，与Chrome导出HTML的结构对应
+    """
+    other = {'type': 'folder', 'name': 'Other bookmarks', 'children': []}
+    chain = []      # 当前打开的文件夹 [(名称, 节点)]
+    node_id = 0
+    for bookmark in bookmarks:
+        folder_path = bookmark.folder_path
+        # 保留与上一个书签相同的文件夹前缀，其余按文档顺序新建，保证遍历顺序与HTML一致
+        common = 0
+        while (common < len(chain) and common < len(folder_path)
+               and chain[common][0] == folder_path[common]):
+            common += 1
+        del chain[common:]
+        for name in folder_path[common:]:
+            folder = {'type': 'folder', 'name': name, 'children': []}
+            (chain[-1][1] if chain else other)['children'].append(folder)
+            chain.append((name, folder))
+
+        node_id += 1
+        (chain[-1][1] if chain else other)['children'].append({
+            'type': 'url', 'id': str(node_id), 'name': bookmark.name, 'url': bookmark.url,
+            'date_added': unix_to_webkit(bookmark.add_date) if bookmark.add_date else '0',
+        })
+
+    data = {
+        'version': 1,
+        'roots': {
+            'bookmark_bar': {'type': 'folder', 'name': 'Bookmarks bar', 'children': []},
+            'other': other,
+            'synced': {'type': 'folder', 'name': 'Mobile bookmarks', 'children': []},
+        },
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def bench_parsers(args):
+    """
+    解析速度：HTMLParser / 逐行快速解析器 / Chrome Bookmarks JSON
+    同时做差异校验，三条路径产出的书签记录必须完全一致
+    """
+    os.makedirs(args.data_dir, exist_ok=True)
+    html_file = os.path.join(args.data_dir, f'bookmarks_{args.count}_{args.seed}.html')
+    json_file = os.path.join(args.data_dir, f'bookmarks_{args.count}_{args.seed}.json')
+    if not os.path.exists(html_file):
+        write_synthetic_export(html_file, args.count, args.seed)
+
+    start = time.perf_counter()
+    from_html = list(BookmarkParser.iter_file(html_file))
+    html_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from_fast = list(FastBookmarkParser.iter_file(html_file))
+    fast_time = time.perf_counter() - start
+
+    if not os.path.exists(json_file):
+        write_chrome_json(json_file, from_html)
+    start = time.perf_counter()
+    from_json = list(ChromeBookmarksReader.iter_file(json_file))
+    json_time = time.perf_counter() - start
+
+    if from_fast != from_html:
+        raise SystemExit("[错误] 快速解析器与 HTMLParser 解析出的书签不一致")
+    if from_json != from_html:
+        raise SystemExit("[错误] HTML 与 JSON 解析出的书签不一致")
+
+    print(f"书签数量: {len(from_html)}")
+    for label, path, elapsed in (('html', html_file, html_time),
+                                 ('fast', html_file, fast_time),
+                                 ('json', json_file, json_time)):
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"  {label:5s}: {elapsed:7.3f} s  {len(from_html) / elapsed:10.0f} 个/秒"
+              f"  加速比 {html_time / elapsed:5.2f}x  ({size_mb:.1f} MB)")
+
+
+def bench_records(args):
+    """
+    书签记录的内存占用：旧的字典 + 每条复制的文件夹列表 vs __slots__ 记录 + 共享路径元组
+    URL、名称等字符串两种方式完全相同，只统计记录本身和文件夹路径的开销
+    """
+    rng = random.Random(args.seed)
+    folders = [tuple(rng.choice(FOLDER_NAMES) for _ in range(rng.randint(1, 4)))
+               for _ in range(args.folders)]
+    fields = [(f'https://{rng.choice(HOSTS)}/{i}', f'Bookmark {i}', str(1600000000 + i),
+               rng.choice(folders)) for i in range(args.count)]
+
+    def measure(build):
+        tracemalloc.start()
+        records = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+        return size
+
+    def build_dicts():
+        return [{'url': url, 'name': name, 'add_date': add_date, 'icon': '',
+                 'folder_path': list(path)} for url, name, add_date, path in fields]
+
+    def build_records():
+        intern_path = PathInterner()
+        return [Bookmark(url, name, add_date, intern_path(path))
+                for url, name, add_date, path in fields]
+
+    dict_size = measure(build_dicts)
+    record_size = measure(build_records)
+    print(f"书签数量: {args.count}  文件夹数量: {args.folders}")
+    for label, size in (('dict', dict_size), ('slots', record_size)):
+        print(f"  {label:6s}: {size / 1024 / 1024:8.1f} MB  {size / args.count:6.1f} 字节/书签")
+    print(f"  节省: {1 - record_size / dict_size:.1%}")
+
+
+def bench_snapshot(args):
+    """
+    快照往返校验与加载速度：解析HTML+分类 vs 加载二进制快照
+    保存后重新加载，分类结果（分类顺序、书签顺序和全部字段）必须与保存前完全一致
+    """
+    os.makedirs(args.data_dir, exist_ok=True)
+    html_file = os.path.join(args.data_dir, f'bookmarks_{args.count}_{args.seed}.html')
+    snapshot_file = os.path.join(args.data_dir, f'bookmarks_{args.count}_{args.seed}.snapshot')
+    if not os.path.exists(html_file):
+        write_synthetic_export(html_file, args.count, args.seed)
+
+    start = time.perf_counter()
+    bookmarks = list(FastBookmarkParser.iter_file(html_file))
+    # 补充一些重复路径，覆盖快照中的全部字段
+    for bookmark in bookmarks[::97]:
+        bookmark.duplicate_paths = (('Imported', 'Duplicates'), bookmark.folder_path)
+    classifier = BookmarkClassifier()
+    classified = classifier.classify_all(bookmarks)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_snapshot(snapshot_file, classified, classifier.rules_version())
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with BookmarkSnapshot(snapshot_file) as snapshot:
+        open_time = time.perf_counter() - start
+        loaded = snapshot.classified()
+        load_time = time.perf_counter() - start
+        if snapshot.rules_version != classifier.rules_version():
+            raise SystemExit("[错误] 快照中的规则版本与保存时不一致")
+        if [snapshot[i] for i in range(0, len(snapshot), 101)] != [
+                b for items in classified.values() for b in items][::101]:
+            raise SystemExit("[错误] 按下标读取的快照书签与保存前不一致")
+    if list(loaded) != list(classified) or loaded != classified:
+        raise SystemExit("[错误] 快照加载后的分类结果与保存前不一致")
+
+    size_mb = os.path.getsize(snapshot_file) / 1024 / 1024
+    print(f"书签数量: {len(bookmarks)}  快照大小: {size_mb:.1f} MB（HTML {os.path.getsize(html_file) / 1024 / 1024:.1f} MB）")
+    print(f"  解析+分类: {parse_time:7.3f} s")
+    print(f"  保存快照:  {write_time:7.3f} s")
+    print(f"  映射快照:  {open_time * 1000:7.3f} ms")
+    print(f"  加载全部:  {load_time:7.3f} s  加速比 {parse_time / load_time:5.2f}x")
+    print("  往返校验通过")
+
+
+def _run_pipeline(input_file, output_dir):
+    """
+    在独立进程中依次运行各阶段，返回每个阶段的耗时和内存
+    各阶段在同一进程中运行，ru_maxrss 只增不减，因此记录每个阶段开始和结束时的常驻内存
+    （rss_start_kb / rss_end_kb），max_rss_kb 是进程到该阶段结束为止的最高值，不是该阶段自己的峰值
+    """
+    stages = []
+
+    def begin():
+        return current_rss_kb(), time.perf_counter()
+
+    def record(stage, started, items):
+        rss_start, start = started
+        elapsed = time.perf_counter() - start
+        stages.append({
+            'stage': stage,
+            'seconds': round(elapsed, 4),
+            'items_per_sec': round(items / elapsed) if elapsed else None,
+            'rss_start_kb': rss_start,
+            'rss_end_kb': current_rss_kb(),
+            'max_rss_kb': peak_rss_kb(),
+        })
+
+    started = begin()
+    bookmarks = list(FastBookmarkParser.iter_file(input_file))
+    record('parse', started, len(bookmarks))
+
+    started = begin()
+    count = len(bookmarks)
+    bookmarks = BookmarkDeduplicator().deduplicate(bookmarks)
+    record('dedup', started, count)
+
+    started = begin()
+    classified = BookmarkClassifier().classify_all(bookmarks)
+    record('classify', started, len(bookmarks))
+
+    started = begin()
+    HTMLGenerator.generate_all(classified, output_dir)
+    record('generate', started, len(bookmarks))
+
+    return len(bookmarks), stages
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_pipeline(args):
+    """按规模生成合成导出文件，分阶段计时，并写入JSON结果文件"""
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [],
+    }
+
+    for size in args.sizes:
+        input_file = os.path.join(args.data_dir, f'bookmarks_{size}_{args.seed}.html')
+        if not os.path.exists(input_file):
+            print(f"生成合成导出文件: {input_file}")
+            write_synthetic_export(input_file, size, args.seed)
+        file_mb = os.path.getsize(input_file) / 1024 / 1024
+
+        output_dir = tempfile.mkdtemp(prefix='bookmark_bench_')
+        try:
+            # 每个规模在新进程中运行，峰值内存互不影响
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                count, stages = executor.submit(_run_pipeline, input_file, output_dir).result()
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        print(f"规模 {size}（{count} 个书签，{file_mb:.1f} MB）")
+        for stage in stages:
+            if stage['rss_end_kb'] is not None:
+                rss_text = (f"常驻内存 {stage['rss_start_kb'] / 1024:7.1f} -> "
+                            f"{stage['rss_end_kb'] / 1024:7.1f} MB")
+            elif stage['max_rss_kb'] is not None:
+                rss_text = f"进程最高内存 {stage['max_rss_kb'] / 1024:7.1f} MB"
+            else:
+                rss_text = ''
+            print(f"  {stage['stage']:9s}: {stage['seconds']:8.3f} s  "
+                  f"{stage['items_per_sec'] or 0:10d} 个/秒  {rss_text}")
+        report['results'].append({
+            'size': size, 'bookmarks': count, 'file_mb': round(file_mb, 2), 'stages': stages,
+        })
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入: {args.output}")
+
+
+def bench_startup(args):
+    """
+    命令行启动耗时：分别启动子进程运行各命令，取多次运行的中位数
+    python -c pass 是解释器本身的启动耗时，其余各项减去它即为导入和参数解析的开销
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(args.data_dir, exist_ok=True)
+    html_file = os.path.join(args.data_dir, f'bookmarks_{args.count}_{args.seed}.html')
+    if not os.path.exists(html_file):
+        write_synthetic_export(html_file, args.count, args.seed)
+
+    commands = [
+        ('python -c pass', ['-c', 'pass']),
+        ('import bookmark_classifier', ['-c', 'import bookmark_classifier']),
+        ('bookmark_cli.py --help', ['bookmark_cli.py', '--help']),
+        ('bookmark_classifier.py --help', ['bookmark_classifier.py', '--help']),
+        (f'bookmark_cli.py stats ({args.count} 个书签)',
+         ['bookmark_cli.py', 'stats', '--input', html_file, '--json']),
+    ]
+    print(f"每项运行 {args.repeat} 次，取中位数")
+    baseline = None
+    for label, command in commands:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *command], cwd=here, check=True,
+                           stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        elapsed = statistics.median(times)
+        if baseline is None:
+            baseline = elapsed
+            print(f"  {label:40s}: {elapsed * 1000:7.1f} ms")
+        else:
+            print(f"  {label:40s}: {elapsed * 1000:7.1f} ms  （解释器之外 {(elapsed - baseline) * 1000:7.1f} ms）")
+
+
+def bench_compare(args):
+    """对比两个 pipeline 结果文件，输出每个阶段的耗时变化"""
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+
+    base_stages = {(r['size'], s['stage']): s for r in base['results'] for s in r['stages']}
+    print(f"基准 {base.get('commit')}  ->  当前 {head.get('commit')}")
+    for result in head['results']:
+        for stage in result['stages']:
+            old = base_stages.get((result['size'], stage['stage']))
+            if old is None or not old['seconds']:
+                continue
+            change = stage['seconds'] / old['seconds'] - 1
+            print(f"  {result['size']:>8d} {stage['stage']:9s}: "
+                  f"{old['seconds']:8.3f} s -> {stage['seconds']:8.3f} s  ({change:+.1%})")
+
+
+def _timed(func, bookmarks):
+    start = time.perf_counter()
+    result = [func(b) for b in bookmarks]
+    return result, time.perf_counter() - start
+
+
+def bench_matcher(args):
+    """对比朴素子串循环与 Aho-Corasick 自动机"""
+    bookmarks = make_synthetic_bookmarks(args.count, args.seed)
+
+    start = time.perf_counter()
+    classifier = BookmarkClassifier()
+    build_time = time.perf_counter() - start
+
+    plain = BookmarkClassifier()
+    plain.host_memo = None
+
+    naive, naive_time = _timed(classifier.classify_bookmark_naive, bookmarks)
+    fast, fast_time = _timed(plain.classify_bookmark, bookmarks)
+    memo, memo_time = _timed(classifier.classify_bookmark, bookmarks)
+
+    start = time.perf_counter()
+    batch = classifier.classify_batch(bookmarks)
+    batch_time = time.perf_counter() - start
+
+    for label, result in (('automaton', fast), ('host-memo', memo), ('batch', batch)):
+        if result != naive:
+            mismatches = sum(1 for a, b in zip(naive, result) if a != b)
+            raise SystemExit(f"[错误] {label} 分类结果不一致: {mismatches} 个书签")
+
+    print(f"书签数量: {len(bookmarks)}  自动机构建: {build_time * 1000:.1f} ms")
+    for label, elapsed in (('naive', naive_time), ('automaton', fast_time),
+                           ('host-memo', memo_time), ('batch', batch_time)):
+        print(f"  {label:10s}: {elapsed:7.3f} s  {len(bookmarks) / elapsed:10.0f} 个/秒"
+              f"  加速比 {naive_time / elapsed:.2f}x")
+
+    hits, misses, size = classifier.host_memo_stats()
+    print(f"  主机名缓存: 命中 {hits}  未命中 {misses}  命中率 {hits / (hits + misses):.1%}")
+
+
+def bench_workers(args):
+    """多进程分类的扩展性：1/2/4/8 个进程"""
+    bookmarks = make_synthetic_bookmarks(args.count, args.seed)
+    baseline = None
+    base_time = None
+
+    print(f"书签数量: {len(bookmarks)}  CPU核心数: {os.cpu_count()}")
+    for workers in args.workers:
+        classifier = BookmarkClassifier()
+        start = time.perf_counter()
+        result = classifier.classify_all(bookmarks, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        # 按分类比较书签对象身份，确保合并顺序与单进程一致
+        snapshot = {c: [id(b) for b in items] for c, items in result.items()}
+        if baseline is None:
+            baseline, base_time = snapshot, elapsed
+        elif snapshot != baseline:
+            raise SystemExit(f"[错误] {workers} 个进程的分类结果与基准不一致")
+
+        print(f"  workers={workers:<2d}: {elapsed:7.3f} s  "
+              f"{len(bookmarks) / elapsed:10.0f} 个/秒  加速比 {base_time / elapsed:.2f}x")
+
+
+def bench_engines(args):
+    """
+    子串引擎 vs 分词引擎：吞吐量与（合成标注数据上的）准确率
+    除总体准确率外，按样本类型分别统计，并给出误报（应为 Other 却归入某分类）、
+    漏报（应归入某分类却为 Other）和分错分类的数量
+    """
+    samples = make_labeled_bookmarks(args.count, args.seed)
+    bookmarks = [b for b, _, _ in samples]
+    kinds = [kind for kind, _ in SAMPLE_KINDS]
+
+    print(f"书签数量: {len(bookmarks)}（合成标注数据，类型: "
+          + '，'.join(f"{kind} {sum(1 for s in samples if s[2] == kind)}" for kind in kinds) + "）")
+    for engine in BookmarkClassifier.ENGINES:
+        classifier = BookmarkClassifier(engine=engine)
+        result, elapsed = _timed(classifier.classify_bookmark, bookmarks)
+        correct = {kind: [0, 0] for kind in kinds}
+        false_pos = false_neg = wrong = 0
+        for predicted, (_, label, kind) in zip(result, samples):
+            correct[kind][1] += 1
+            if predicted == label:
+                correct[kind][0] += 1
+            elif label == 'Other':
+                false_pos += 1
+            elif predicted == 'Other':
+                false_neg += 1
+            else:
+                wrong += 1
+        total = sum(ok for ok, _ in correct.values())
+        print(f"  {engine:10s}: {elapsed:7.3f} s  {len(bookmarks) / elapsed:10.0f} 个/秒"
+              f"  准确率 {total / len(bookmarks):.1%}  误报 {false_pos}  漏报 {false_neg}  分错 {wrong}")
+        print("              按类型: " + '  '.join(
+            f"{kind} {ok / n:.1%}" for kind, (ok, n) in correct.items() if n))
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Chrome书签分类器性能基准')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    matcher = subparsers.add_parser('matcher', help='关键词匹配: 朴素循环 vs 自动机 vs 主机名缓存')
+    matcher.add_argument('--count', type=int, default=20000, help='合成书签数量')
+    matcher.set_defaults(func=bench_matcher)
+
+    engines = subparsers.add_parser('engines', help='匹配引擎: 子串 vs 分词（吞吐量与准确率）')
+    engines.add_argument('--count', type=int, default=50000, help='合成书签数量')
+    engines.set_defaults(func=bench_engines)
+
+    workers = subparsers.add_parser('workers', help='多进程分类扩展性')
+    workers.add_argument('--count', type=int, default=200000, help='合成书签数量')
+    workers.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                         help='要测试的进程数')
+    workers.set_defaults(func=bench_workers)
+
+    pipeline = subparsers.add_parser('pipeline', help='合成导出文件的分阶段基准（解析/分类/生成）')
+    pipeline.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                          help='合成导出文件的书签数量')
+    pipeline.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bookmark_bench'),
+                          help='合成导出文件的存放目录（已存在的文件会复用）')
+    pipeline.add_argument('--output', default='bench_results.json', help='JSON结果文件')
+    pipeline.set_defaults(func=bench_pipeline)
+
+    parsers = subparsers.add_parser('parsers', help='解析速度与差异校验: HTMLParser vs 快速解析器 vs Chrome Bookmarks JSON')
+    parsers.add_argument('--count', type=int, default=100000, help='合成书签数量')
+    parsers.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bookmark_bench'),
+                         help='合成文件的存放目录（已存在的文件会复用）')
+    parsers.set_defaults(func=bench_parsers)
+
+    records = subparsers.add_parser('records', help='书签记录内存占用: 字典 vs __slots__ 记录')
+    records.add_argument('--count', type=int, default=1000000, help='书签数量')
+    records.add_argument('--folders', type=int, default=500, help='不同文件夹路径数量')
+    records.set_defaults(func=bench_records)
+
+    snapshot = subparsers.add_parser('snapshot', help='二进制快照往返校验与加载速度: 解析+分类 vs 加载快照')
+    snapshot.add_argument('--count', type=int, default=100000, help='合成书签数量')
+    snapshot.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bookmark_bench'),
+                          help='合成文件和快照的存放目录（已存在的合成文件会复用）')
+    snapshot.set_defaults(func=bench_snapshot)
+
+    startup = subparsers.add_parser('startup', help='命令行启动耗时: 导入、--help 和 stats 子命令')
+    startup.add_argument('--count', type=int, default=1000, help='stats 使用的合成书签数量')
+    startup.add_argument('--repeat', type=int, default=7, help='每项的运行次数')
+    startup.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bookmark_bench'),
+                         help='合成文件的存放目录（已存在的文件会复用）')
+    startup.set_defaults(func=bench_startup)
+
+    compare = subparsers.add_parser('compare', help='对比两个 pipeline 结果文件')
+    compare.add_argument('base', help='基准结果文件')
+    compare.add_argument('head', help='当前结果文件')
+    compare.set_defaults(func=bench_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,20 +6,37 @@ Chrome Bookmark Classifier
 """
 
 import re
+from html import unescape
 from html.parser import HTMLParser
 from collections import defaultdict
+from functools import lru_cache, partial
+from itertools import chain, islice
+import argparse
 import os
+import sys
+import time
 from config import Config
 
+# 解析和分类（含统计模式）用到的模块；缓存、剖析、快照、搜索索引和输出清单
+# 在用到它们的函数中才导入，stats / dedup 不加载这些模块
+from classification_rules import RuleSet, RulesError
+from chrome_bookmarks import ChromeBookmarksReader, default_bookmarks_file, is_chrome_json
+from bookmark_record import Bookmark, PathInterner
+from bookmark_dedup import BookmarkDeduplicator, normalize_url
+
 
 class BookmarkParser(HTMLParser):
     """解析Chrome书签HTML文件"""
 
-    def __init__(self):
+    def __init__(self, keep_icons=True):
         super().__init__()
+        self.keep_icons = keep_icons
         self.bookmarks = []
         self.folder_stack = []
         self.current_folder = []
+        # 当前文件夹路径的共享元组，只在进入/退出文件夹时更新
+        self.intern_path = PathInterner()
+        self.current_path = ()
         self.in_dt = False
         self.in_h3 = False
         self.current_link = None
@@ -39,20 +56,16 @@ class BookmarkParser(HTMLParser):
         elif tag == 'a':
             href = attrs_dict.get('href', '')
             add_date = attrs_dict.get('add_date', '')
-            icon = attrs_dict.get('icon', '')
+            # 输出从不使用图标，流式模式下直接丢弃base64数据
+            icon = attrs_dict.get('icon', '') if self.keep_icons else ''
 
-            self.current_link = {
-                'url': href,
-                'name': '',
-                'add_date': add_date,
-                'icon': icon,
-                'folder_path': list(self.current_folder)
-            }
+            self.current_link = Bookmark(href, '', add_date, self.current_path, icon)
 
         elif tag == 'dl':
             if self.folder_name:
                 self.current_folder.append(self.folder_name)
                 self.folder_stack.append(self.folder_name)
+                self.current_path = self.intern_path(self.current_folder)
                 self.folder_name = ""
 
     def handle_endtag(self, tag):
@@ -60,8 +73,10 @@ class BookmarkParser(HTMLParser):
 
         if tag == 'a':
             # 当遇到</a>标签时，保存书签
-            if self.current_link and self.current_link['name']:
-                self.bookmarks.append(self.current_link)
+            if self.current_link:
+                self.current_link.name = self.current_link.name.strip()
+                if self.current_link.name:
+                    self.bookmarks.append(self.current_link)
             self.current_link = None
 
         elif tag == 'dt':
@@ -69,26 +84,174 @@ class BookmarkParser(HTMLParser):
 
         elif tag == 'h3':
             self.in_h3 = False
+            self.folder_name = self.folder_name.strip()
 
         elif tag == 'dl':
             if self.current_folder:
                 self.current_folder.pop()
+                self.current_path = self.intern_path(self.current_folder)
 
     def handle_data(self, data):
-        data = data.strip()
-        if not data:
-            return
-
+        # 分块读取时同一段文本可能被拆成多次回调，先拼接，结束标签处再去除空白
         if self.in_h3:
-            self.folder_name = data
+            self.folder_name += data
 
         elif self.current_link is not None:
-            self.current_link['name'] = data
-   
+            self.current_link.name += data
+
+    @classmethod
+    def iter_file(cls, input_file, chunk_size=None, keep_icons=False):
+        """
+        流式解析书签文件：按固定大小分块读取，每遇到</a>立即产出书签
+        内存占用只与单个标签大小有关，与文件总大小无关
+        """
+        chunk_size = chunk_size or Config.CHUNK_SIZE
+        parser = cls(keep_icons=keep_icons)
+        with open(input_file, 'r', encoding=Config.ENCODING) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                if parser.bookmarks:
+                    yield from parser.bookmarks
+                    parser.bookmarks = []
+        parser.close()
+        yield from parser.bookmarks
+        parser.bookmarks = []
+
+
+class MalformedExportError(ValueError):
+    """书签文件不符合Chrome导出的逐行格式，需要改用 HTMLParser 解析"""
+
+
+class FastBookmarkParser:
+    """
+    Chrome导出书签文件的快速解析器
+    Chrome 的导出格式固定且逐行排列，直接用正则逐行提取 HREF、ADD_DATE、名称和文件夹层级，
+    不经过 HTMLParser 的逐个标签回调；结果与 BookmarkParser 一致。
+    遇到无法识别的行时抛出 MalformedExportError，由 iter_file 回退到 BookmarkParser
+    """
+
+    # 属性部分只接受双引号属性，其余写法交给 HTMLParser
+    _LINK_RE = re.compile(r'<DT><A((?:\s+[A-Za-z_:][-A-Za-z0-9_:.]*="[^"]*")*)\s*>([^<]*)</A>', re.I)
+    _FOLDER_RE = re.compile(r'<DT><H3(?:\s[^<>]*)?>([^<]*)</H3>', re.I)
+    _ATTR_RE = re.compile(r'([A-Za-z_:][-A-Za-z0-9_:.]*)="([^"]*)"')
+    _OPEN_RE = re.compile(r'<DL>(?:<p>)?', re.I)
+    _CLOSE_RE = re.compile(r'</DL>(?:<p>)?', re.I)
+    # 文件头中可以忽略的行
+    _IGNORED_RE = re.compile(
+        r'<!DOCTYPE[^<>]*>|<META\s[^<>]*>|<TITLE>[^<]*</TITLE>|<H1>[^<]*</H1>|<p>|<!--.*-->', re.I)
+
+    @classmethod
+    def parse_attrs(cls, text):
+        """解析已校验过的双引号属性，属性名转小写（同名属性以最后一个为准）"""
+        return {name.lower(): value for name, value in cls._ATTR_RE.findall(text)}
+
+    @classmethod
+    def iter_lines(cls, lines, keep_icons=False, memo=None):
+        """
+        逐行解析，产出与 BookmarkParser 相同结构的书签
+        memo: 可选的 {书签行: (url, 名称, add_date)} 字典，重复解析同一文件时跳过未变化的行
+        """
+        current_folder = []
+        current_path = ()
+        intern_path = PathInterner()
+        folder_name = ''
+        in_comment = False
+
+        for line_no, line in enumerate(lines, 1):
+            line = line.strip()
+            if in_comment:
+                in_comment = '-->' not in line
+                continue
+            if not line:
+                continue
+
+            if memo is not None:
+                fields = memo.get(line)
+                if fields is not None:
+                    if fields[1]:
+                        yield Bookmark(*fields, current_path)
+                    continue
+
+            match = cls._LINK_RE.fullmatch(line)
+            if match:
+                attrs = cls.parse_attrs(match.group(1))
+                name = unescape(match.group(2)).strip()
+                if memo is not None and not keep_icons:
+                    memo[line] = fields = (unescape(attrs.get('href', '')), name,
+                                           unescape(attrs.get('add_date', '')))
+                    if name:
+                        yield Bookmark(*fields, current_path)
+                elif name:
+                    yield Bookmark(
+                        unescape(attrs.get('href', '')),
+                        name,
+                        unescape(attrs.get('add_date', '')),
+                        current_path,
+                        unescape(attrs.get('icon', '')) if keep_icons else '',
+                    )
+                continue
+
+            match = cls._FOLDER_RE.fullmatch(line)
+            if match:
+                folder_name = unescape(match.group(1)).strip()
+            elif cls._OPEN_RE.fullmatch(line):
+                if folder_name:
+                    current_folder.append(folder_name)
+                    current_path = intern_path(current_folder)
+                    folder_name = ''
+            elif cls._CLOSE_RE.fullmatch(line):
+                if current_folder:
+                    current_folder.pop()
+                    current_path = intern_path(current_folder)
+            elif line.startswith('<!--') and '-->' not in line:
+                in_comment = True
+            elif not cls._IGNORED_RE.fullmatch(line):
+                raise MalformedExportError(f"第 {line_no} 行无法识别: {line[:80]}")
+
+    @classmethod
+    def iter_file(cls, input_file, keep_icons=False, memo=None):
+        """
+        流式解析书签文件；格式不规范时回退到 BookmarkParser，
+        并跳过快速解析阶段已经产出的书签（memo 见 iter_lines）
+        """
+        produced = 0
+        try:
+            with open(input_file, 'r', encoding=Config.ENCODING) as f:
+                for bookmark in cls.iter_lines(f, keep_icons, memo):
+                    produced += 1
+                    yield bookmark
+        except MalformedExportError as e:
+            # 诊断信息写到标准错误，stats --json 的标准输出只有一行 JSON
+            print(f"      [提示] {e}，改用 HTMLParser 解析", file=sys.stderr)
+            for index, bookmark in enumerate(BookmarkParser.iter_file(input_file, keep_icons=keep_icons)):
+                if index >= produced:
+                    yield bookmark
+
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """
+    按需导入 numpy：导入需要约 0.1 s，只有批量评分用得到，不放在模块顶部拖慢启动
+    numpy 为可选依赖，未安装时返回 None，批量评分退回逐个计算
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# 匹配 URL 中的主机部分，要求其后紧跟路径、查询或锚点分隔符
+_HOST_RE = re.compile(r'[a-z][a-z0-9+.-]*://([^/?#\s]+)(?=[/?#])')
+
+
 class BookmarkClassifier:
     """书签智能分类器（极客 / AI / 编程 技术向重构版）"""
 
-    # 定义分类规则（关键词匹配）
+    # 定义分类规则（关键词匹配）；Config.RULES_FILE 指定规则文件时以文件为准
     CATEGORIES = {
         # 1. AI / Machine Learning 核心
         'AI/ML': [
@@ -255,24 +418,123 @@ class BookmarkClassifier:
         ]
     }
 
-    def __init__(self):
+    # 可选的匹配引擎：substring 为子串匹配（默认），token 为按词边界匹配
+    ENGINES = ('substring', 'token')
+
+    def __init__(self, engine=None, rules=None, folder_weight=None, rules_cache_dir=True):
         self.classified_bookmarks = defaultdict(list)
+        self.engine = engine or Config.MATCH_ENGINE
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"未知的匹配引擎: {self.engine}")
+
+        # rules_cache_dir 为 True 时使用 Config.get_rules_cache_dir()，None 表示不读写磁盘缓存
+        if rules_cache_dir is True:
+            rules_cache_dir = Config.get_rules_cache_dir()
+        # 工作进程直接使用父进程解析好的缓存目录（spawn 启动时看不到父进程对 Config 的修改）
+        self.rules_cache_dir = rules_cache_dir
+        if rules is None:
+            rules = self.load_rules(Config.RULES_FILE, rules_cache_dir)
+        self.rules = rules
+        self.categories = rules.categories
+
+        # 关键词表只编译一次，单次扫描即可得到全部命中；规则文件的编译结果缓存在磁盘上
+        self.matcher, self.token_matcher = rules.compile(self.engine, rules_cache_dir)
+        self._weights = None    # 批量评分用的权重矩阵，首次使用时构建
+
+        # 主机名匹配结果按主机缓存（LRU），同一域名下的书签只扫描一次主机名
+        # 若有关键词包含分隔符，可能跨越主机名边界，此时退回整串扫描
+        self.host_memo = None
+        if (Config.HOST_MEMO_SIZE and self.token_matcher is None
+                and not self.matcher.contains_any('/?#')):
+            self.host_memo = lru_cache(maxsize=Config.HOST_MEMO_SIZE)(self._match_host)
+
+        # 文件夹路径评分（可选）：文件夹名与URL/名称使用同一套关键词，按路径缓存在字典树中
+        folder_weight = self.resolve_folder_weight(folder_weight)
+        self.folder_weight = folder_weight
+        self.folder_scores = None
+        if folder_weight:
+            from folder_scoring import FolderScoreTrie
+            self.folder_scores = FolderScoreTrie(self._match_text, self.matcher, folder_weight)
+
+    @classmethod
+    def load_rules(cls, rules_file=None, cache_dir=True):
+        """读取规则文件；未指定时使用内置的 CATEGORIES（cache_dir 同 __init__ 的 rules_cache_dir）"""
+        if rules_file:
+            if cache_dir is True:
+                cache_dir = Config.get_rules_cache_dir()
+            return RuleSet.from_file(rules_file, cache_dir)
+        return RuleSet(cls.CATEGORIES)
+
+    def _match_host(self, host):
+        return frozenset(self.matcher.find(host))
+
+    def _match_text(self, text):
+        """返回一段小写文本（文件夹名）命中的模式id集合"""
+        if self.token_matcher is not None:
+            return self.token_matcher.find_tokens(self.token_matcher.tokenize(text), set())
+        return self.matcher.find(text)
+
+    def host_memo_stats(self):
+        """主机名缓存统计：(命中, 未命中, 当前大小)，未启用时返回 None"""
+        if self.host_memo is None:
+            return None
+        info = self.host_memo.cache_info()
+        return info.hits, info.misses, info.currsize
+
+    @staticmethod
+    def build_search_text(bookmark):
+        """组合搜索文本（只包含URL和名称）"""
+        return f"{bookmark.url.lower()} {bookmark.name.lower()}"
 
     def classify_bookmark(self, bookmark):
         """
-        根据URL和书签名称对书签进行分类（不再使用文件夹关键词）
+        根据URL和书签名称对书签进行分类
+        开启文件夹评分时，再加上所在文件夹路径的先验得分
         """
-        url_lower = bookmark['url'].lower()
-        name_lower = bookmark['name'].lower()
+        hits = self.match_bookmark(bookmark)
+        scores = self.matcher.score_hits(hits)
+        if self.folder_scores is not None:
+            scores = self.add_folder_scores(scores, bookmark.folder_path)
 
-        # 组合搜索文本（只包含URL和名称）
-        search_text = f"{url_lower} {name_lower}"
+        # 返回得分最高的分类，如果没有匹配则返回 'Other'
+        return self.matcher.pick_best(scores)
+
+    def add_folder_scores(self, scores, folder_path):
+        """URL/名称得分加上文件夹路径的先验得分（路径上没有命中时原样返回）"""
+        prior = self.folder_scores.scores(folder_path)
+        if prior is None:
+            return scores
+        return [score + extra for score, extra in zip(scores, prior)]
+
+    def match_bookmark(self, bookmark):
+        """返回书签命中的关键词模式id集合"""
+        url_lower = bookmark.url.lower()
+        name_lower = bookmark.name.lower()
+
+        if self.token_matcher is not None:
+            return self.token_matcher.find_bookmark(url_lower, name_lower)
+
+        if self.host_memo is not None:
+            match = _HOST_RE.match(url_lower)
+            if match:
+                # 主机名查缓存，只扫描协议、路径和名称部分
+                start, end = match.span(1)
+                rest = f"{url_lower[:start]}{url_lower[end:]} {name_lower}"
+                return self.matcher.find(rest, set(self.host_memo(url_lower[start:end])))
+
+        return self.matcher.find(f"{url_lower} {name_lower}")
+
+    def classify_bookmark_naive(self, bookmark):
+        """
+        逐个关键词做子串匹配的原始实现，作为自动机的对照基准（不考虑权重和优先级）
+        """
+        search_text = self.build_search_text(bookmark)
 
         # 记录匹配分数
         scores = defaultdict(int)
 
         # 检查每个分类
-        for category, keywords in self.CATEGORIES.items():
+        for category, keywords in self.categories.items():
             # URL和名称关键词匹配
             for keyword in keywords:
                 if keyword.lower() in search_text:
@@ -284,27 +546,382 @@ class BookmarkClassifier:
             return best_category
         return 'Other'
 
-    def classify_all(self, bookmarks):
-        """对所有书签进行分类"""
-        for bookmark in bookmarks:
-            category = self.classify_bookmark(bookmark)
-            self.classified_bookmarks[category].append(bookmark)
+    def rules_version(self):
+        """当前分类规则、匹配引擎（和文件夹评分权重）的版本号，用于缓存失效判断"""
+        return self.version_of(self.rules, self.engine, self.folder_weight)
+
+    @staticmethod
+    def resolve_folder_weight(folder_weight=None):
+        """文件夹评分权重：None 时按 Config.FOLDER_SCORING / FOLDER_WEIGHT 决定，0 表示不启用"""
+        if folder_weight is None:
+            return Config.FOLDER_WEIGHT if Config.FOLDER_SCORING else 0
+        return folder_weight
+
+    @classmethod
+    def version_of(cls, rules, engine=None, folder_weight=None):
+        """
+        不构建分类器，直接计算给定规则、引擎和文件夹评分权重下的版本号（与 rules_version() 一致），
+        参数的默认值与 __init__ 相同；加载快照时用来判断分类结果是否过期
+        """
+        from classification_cache import rules_version
 
+        payload = [*rules.version_payload(), engine or Config.MATCH_ENGINE]
+        folder_weight = cls.resolve_folder_weight(folder_weight)
+        if folder_weight:
+            payload.append(folder_weight)
+        return rules_version(*payload)
+
+    def classify_all(self, bookmarks, workers=1, cache=None):
+        """
+        对所有书签进行分类
+        workers > 1 时使用多进程；提供 cache 时只对缓存未命中的书签重新分类
+        """
+        if workers <= 1 and cache is None and not Config.BATCH_SCORING:
+            for bookmark in bookmarks:
+                category = self.classify_bookmark(bookmark)
+                self.classified_bookmarks[category].append(bookmark)
+
+            return self.classified_bookmarks
+
+        bookmarks = list(bookmarks)
+        categories = self.classify_many(bookmarks, workers, cache)
+        # 按原始顺序合并，保证结果与单进程完全一致
+        for bookmark, category in zip(bookmarks, categories):
+            self.classified_bookmarks[category].append(bookmark)
         return self.classified_bookmarks
 
+    def classify_many(self, bookmarks, workers=1, cache=None):
+        """返回与输入顺序一致的分类名称列表"""
+        if cache is None:
+            if workers > 1:
+                return self.classify_parallel(bookmarks, workers)
+            if Config.BATCH_SCORING:
+                return self.classify_batch(bookmarks)
+            return [self.classify_bookmark(b) for b in bookmarks]
+
+        categories = cache.get_many(bookmarks)
+        missing = [i for i, category in enumerate(categories) if category is None]
+        if missing:
+            pending = [bookmarks[i] for i in missing]
+            results = self.classify_many(pending, workers)
+            for i, category in zip(missing, results):
+                categories[i] = category
+            cache.put_many(pending, results)
+        return categories
+
+    def classify_explained(self, bookmarks, explanation):
+        """
+        解释模式：逐个分类，同时把命中的关键词和平分决策记录到 explanation
+        （ClassificationExplanation），返回与输入顺序一致的分类名称列表
+        """
+        match = self.match_bookmark
+        score_hits = self.matcher.score_hits
+        record = explanation.record
+        categories = []
+        for bookmark in bookmarks:
+            hits = match(bookmark)
+            scores = score_hits(hits)
+            if self.folder_scores is not None:
+                scores = self.add_folder_scores(scores, bookmark.folder_path)
+            categories.append(record(hits, scores))
+        return categories
+
+    def classify_batch(self, bookmarks, batch_size=None):
+        """
+        批量分类：命中以稀疏形式（每个书签的关键词id列表）保存，与按 CSR 存储的
+        关键词 x 分类 权重矩阵相乘（展开每个命中关键词的非零权重，用 bincount 按 书签x分类 累加），
+        按行取 argmax（权重矩阵的列按平分优先顺序排列）
+        实验性（Config.BATCH_SCORING 默认关闭）：耗时主要在关键词匹配上，目前没有比逐个计分更快的场景；
+        与 pick_best 的平分结果一致依赖浮点求和顺序，带小数权重时可能因舍入误差选出不同的分类
+        未安装 numpy 时退回逐个分类
+        """
+        np = load_numpy()
+        if np is None:
+            return [self.classify_bookmark(b) for b in bookmarks]
+
+        if self._weights is None:
+            weights = self.matcher.weight_matrix(np)
+            keyword_ids, weight_columns = np.nonzero(weights)
+            # CSR: 第 pid 个关键词的非零权重为 [offsets[pid], offsets[pid+1])
+            offsets = np.searchsorted(keyword_ids, np.arange(len(weights) + 1))
+            self._weights = (offsets[:-1], np.diff(offsets), weight_columns,
+                             weights[keyword_ids, weight_columns])
+        starts, lengths, weight_columns, weight_values = self._weights
+        batch_size = batch_size or Config.CLASSIFY_CHUNK_SIZE
+        category_names = np.array(self.matcher.ranked_categories() + ['Other'], dtype=object)
+        other = len(self.matcher.categories)
+        columns = np.array(self.matcher.rank or range(other), dtype=np.intp)
+
+        categories = []
+        for offset in range(0, len(bookmarks), batch_size):
+            batch = bookmarks[offset:offset + batch_size]
+            hits = [self.match_bookmark(b) for b in batch]
+            counts = np.fromiter(map(len, hits), dtype=np.intp, count=len(hits))
+            cols = np.fromiter(chain.from_iterable(hits), dtype=np.intp, count=int(counts.sum()))
+            rows = np.repeat(np.arange(len(hits)), counts)
+
+            # 每个命中展开为其关键词的全部非零权重，按 (书签, 分类) 累加
+            per_hit = lengths[cols]
+            entries = np.arange(int(per_hit.sum())) + np.repeat(starts[cols] - (np.cumsum(per_hit) - per_hit),
+                                                                 per_hit)
+            scores = np.bincount(np.repeat(rows, per_hit) * other + weight_columns[entries],
+                                 weights=weight_values[entries],
+                                 minlength=len(batch) * other).reshape(len(batch), other)
+            if self.folder_scores is not None:
+                # 文件夹先验得分按权重矩阵的列顺序（平分优先顺序）排列后相加
+                for row, bookmark in enumerate(batch):
+                    prior = self.folder_scores.scores(bookmark.folder_path)
+                    if prior is not None:
+                        scores[row] += np.asarray(prior)[columns]
+            best = scores.argmax(axis=1)
+            best[scores.max(axis=1) <= 0] = other
+            categories.extend(category_names[best].tolist())
+        return categories
+
+    def classify_parallel(self, bookmarks, workers, chunk_size=None):
+        """
+        将书签切分成块，在进程池中分类，返回与输入顺序一致的分类名称列表
+        每个工作进程只在启动时编译一次关键词表
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunk_size = chunk_size or Config.CLASSIFY_CHUNK_SIZE
+        # 只传递分类需要的字段，减少进程间序列化开销（文件夹评分时加上文件夹路径）
+        with_folders = self.folder_scores is not None
+        chunks = [
+            [(b.url, b.name, '', b.folder_path) if with_folders else (b.url, b.name)
+             for b in bookmarks[i:i + chunk_size]]
+            for i in range(0, len(bookmarks), chunk_size)
+        ]
+
+        categories = []
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_classify_worker,
+                                 initargs=(type(self), self.engine, self.rules,
+                                           self.folder_weight, self.rules_cache_dir)) as executor:
+            for result in executor.map(_classify_chunk, chunks):
+                categories.extend(result)
+        return categories
+
+
+# 工作进程内的分类器实例，由 _init_classify_worker 初始化
+_worker_classifier = None
+
+
+def _init_classify_worker(classifier_class, engine, rules, folder_weight=0, rules_cache_dir=None):
+    """
+    进程池初始化：每个工作进程构建一次分类器（文件夹路径缓存各进程独立）
+    rules_cache_dir 由父进程传入，工作进程不读取 Config.OUTPUT_DIR
+    """
+    global _worker_classifier
+    _worker_classifier = classifier_class(engine=engine, rules=rules, folder_weight=folder_weight,
+                                          rules_cache_dir=rules_cache_dir)
+
+
+def _classify_chunk(items):
+    """在工作进程中分类一块 (url, name[, add_date, folder_path]) 数据"""
+    bookmarks = [Bookmark(*fields) for fields in items]
+    if Config.BATCH_SCORING:
+        return _worker_classifier.classify_batch(bookmarks)
+    classify = _worker_classifier.classify_bookmark
+    return [classify(b) for b in bookmarks]
+
 
 class HTMLGenerator:
     """生成分类后的HTML文件"""
 
+    # 索引页中每个分类的图标（匹配内置分类名称），规则文件中的 icon 会覆盖这里的设置
+    CATEGORY_ICONS = {
+        'AI/ML': '🤖',
+        'Programming': '💻',
+        'Python': '🐍',
+        'Web & JS': '🌐',
+        'C/C++ & Systems': '⚙️',
+        'Unreal Engine & Game Dev': '🎮',
+        'Linux & DevOps': '🐧',
+        'Tools & Productivity': '🛠️',
+        'Tech Communities': '💬',
+        'Docs & Specs': '📚',
+        'Gaming': '🎲',
+        'Cryptocurrency': '₿',
+        'Video & Learning': '🎥',
+        'Design & Art': '🎨',
+        'Tech News': '📰',
+        'Shopping': '🛍️',
+        'Social Media': '📱',
+        'Jobs & Career': '💼',
+        'Other': '📂'
+    }
+
+    @staticmethod
+    def category_filename(category_name):
+        """将分类名转换为安全的文件名（替换特殊字符）"""
+        safe_filename = category_name.lower().replace(' ', '_').replace('/', '_').replace('&', '_and_')
+        return safe_filename + '.html'
+
+    @staticmethod
+    def generate_all(classified_bookmarks, output_dir, workers=None, icons=None,
+                     only=None, index=True, manifest=None, search=None):
+        """
+        并发生成所有分类文件和 index.html（icons 为额外的分类图标）
+        only 为需要重新生成的分类名称集合（None 表示全部），index=False 时不生成 index.html
+        先写入同目录下的临时文件，全部生成成功后再逐个原子替换：单个文件不会是写了一半的内容，
+        生成阶段出错时不替换任何文件；但替换是逐个进行的，替换中途出错时已替换的文件为新内容、
+        其余保留旧内容，剩下的临时文件会被删除。返回 [(文件名, 耗时秒)]
+
+        提供 manifest（OutputManifest）时为确定性输出：分类文件的时间戳取自书签本身，
+        内容与清单记录完全相同的文件不再写入，记录在 manifest.skipped 中
+        search（默认 Config.SEARCH_INDEX）为真时同时生成每个分类的搜索索引分片和索引页搜索框
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from search_index import shard_filename, write_search_shard
+
+        if search is None:
+            search = Config.SEARCH_INDEX
+
+        def render(filename, write):
+            start = time.perf_counter()
+            digest = None
+            if manifest is not None:
+                # 先只计算哈希，内容未变化时不产生任何写入
+                digest = manifest.content_digest(write)
+                if manifest.is_current(filename, digest):
+                    return filename, None, digest, time.perf_counter() - start
+            tmp_path = os.path.join(output_dir, f'.{filename}.{os.getpid()}.tmp')
+            try:
+                # 边生成边写入缓冲文件，内存占用只与缓冲区大小有关
+                with open(tmp_path, 'w', encoding=Config.ENCODING,
+                          buffering=Config.WRITE_BUFFER_SIZE) as f:
+                    write(f)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return filename, tmp_path, digest, time.perf_counter() - start
+
+        jobs = []
+        for name, items in classified_bookmarks.items():
+            if only is None or name in only:
+                filename = HTMLGenerator.category_filename(name)
+                shards = HTMLGenerator.category_shards(name, len(items))
+                for number, (shard_file, start, end) in enumerate(shards, 1):
+                    # 超过单文件上限的分类按顺序拆成多个文件，用 islice 遍历，不复制列表
+                    title = name if len(shards) == 1 else f'{name} ({number}/{len(shards)})'
+                    timestamp = None
+                    if manifest is not None:
+                        timestamp = HTMLGenerator.stable_timestamp(islice(items, start, end))
+                    jobs.append((shard_file, partial(HTMLGenerator.write_category_html, title,
+                                                     items, timestamp=timestamp,
+                                                     start=start, end=end)))
+                if search:
+                    jobs.append((shard_filename(filename),
+                                 partial(write_search_shard, name,
+                                         [shard_file for shard_file, _, _ in shards],
+                                         shards[0][2] - shards[0][1] or 1, items)))
+        if index:
+            jobs.append(('index.html', lambda f: f.write(
+                HTMLGenerator.render_index_html(classified_bookmarks, icons, search))))
+
+        with ThreadPoolExecutor(max_workers=workers or Config.OUTPUT_WORKERS) as executor:
+            futures = [executor.submit(render, *job) for job in jobs]
+            results, errors = [], []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            for _, tmp_path, _, _ in results:
+                if tmp_path is not None:
+                    os.remove(tmp_path)
+            raise errors[0]
+
+        written = []
+        try:
+            for filename, tmp_path, digest, elapsed in results:
+                if tmp_path is None:
+                    manifest.skip(filename)
+                    continue
+                os.replace(tmp_path, os.path.join(output_dir, filename))
+                if manifest is not None:
+                    manifest.record(filename, digest)
+                written.append((filename, elapsed))
+        except BaseException:
+            # 删除尚未替换的临时文件；清单只记录已经替换的文件，与磁盘上的内容一致
+            for _, tmp_path, _, _ in results:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            if manifest is not None:
+                manifest.save()
+            raise
+        if manifest is not None:
+            manifest.save()
+        return written
+
     @staticmethod
-    def generate_category_html(category_name, bookmarks, output_file):
+    def category_shards(category_name, count, max_per_file=None):
+        """
+        分类的输出文件划分，返回 [(文件名, 起始下标, 结束下标)]
+        不超过 Config.MAX_BOOKMARKS_PER_FILE（0 表示不拆分）时只有一个文件，
+        否则依次编号为 <分类>_1.html、<分类>_2.html ...
+        """
+        if max_per_file is None:
+            max_per_file = Config.MAX_BOOKMARKS_PER_FILE
+        filename = HTMLGenerator.category_filename(category_name)
+        if not max_per_file or count <= max_per_file:
+            return [(filename, 0, count)]
+        base = filename[:-len('.html')]
+        return [(f'{base}_{number}.html', start, min(start + max_per_file, count))
+                for number, start in enumerate(range(0, count, max_per_file), 1)]
+
+    @staticmethod
+    def category_files(category_name, count, search=None):
+        """分类对应的全部输出文件名（分片文件和搜索索引分片）"""
+        files = [filename for filename, _, _ in HTMLGenerator.category_shards(category_name, count)]
+        if Config.SEARCH_INDEX if search is None else search:
+            from search_index import shard_filename
+            files.append(shard_filename(HTMLGenerator.category_filename(category_name)))
+        return files
+
+    @staticmethod
+    def output_files(classified_bookmarks, search=None):
+        """generate_all 生成的全部文件名（各分类的文件和 index.html）"""
+        files = ['index.html']
+        for name, items in classified_bookmarks.items():
+            files.extend(HTMLGenerator.category_files(name, len(items), search))
+        return files
+
+    @staticmethod
+    def stable_timestamp(bookmarks):
+        """确定性输出的分类时间戳：Config.OUTPUT_TIMESTAMP，未设置时取书签中最新的 ADD_DATE"""
+        if Config.OUTPUT_TIMESTAMP is not None:
+            return str(Config.OUTPUT_TIMESTAMP)
+        newest = 0
+        for bookmark in bookmarks:
+            add_date = bookmark.add_date
+            if add_date.isdigit() and int(add_date) > newest:
+                newest = int(add_date)
+        return str(newest)
+
+    @staticmethod
+    def generate_category_html(category_name, bookmarks, output_file, timestamp=None):
         """为单个分类生成HTML文件（标准Chrome书签格式）"""
-        import time
+        # 边生成边写入缓冲文件，内存占用只与缓冲区大小有关
+        with open(output_file, 'w', encoding=Config.ENCODING,
+                  buffering=Config.WRITE_BUFFER_SIZE) as f:
+            HTMLGenerator.write_category_html(category_name, bookmarks, f, timestamp)
 
+    @staticmethod
+    def write_category_html(category_name, bookmarks, f, timestamp=None, start=None, end=None):
+        """
+        将单个分类的Chrome书签格式内容依次写入文件对象（timestamp 默认为当前时间）
+        start / end 只写出 bookmarks[start:end]，用于拆分大分类
+        """
         # 生成时间戳
-        current_time = str(int(time.time()))
+        current_time = timestamp or str(int(time.time()))
 
-        html_content = f'''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+        f.write(f'''<!DOCTYPE NETSCAPE-Bookmark-file-1>
 <!-- This is an automatically generated file.
      It will be read and overwritten.
      DO NOT EDIT! -->
@@ -314,27 +931,32 @@ class HTMLGenerator:
 <DL>
     <DT><H3 ADD_DATE="{current_time}" LAST_MODIFIED="{current_time}">{category_name}</H3>
     <DL><p>
-'''
+''')
 
         # 直接列出所有书签（不包含ICON以避免Chrome导入问题）
+        write = f.write
+        if start is not None or end is not None:
+            bookmarks = islice(bookmarks, start, end)
         for bookmark in bookmarks:
             # 暂时不添加ICON属性，因为Chrome可能无法正确解析长的base64数据
             # icon_attr = f' ICON="{bookmark["icon"]}"' if bookmark.get('icon') else ''
-            add_date_attr = f' ADD_DATE="{bookmark["add_date"]}"' if bookmark.get('add_date') else f' ADD_DATE="{current_time}"'
+            add_date = bookmark.add_date or current_time
 
-            html_content += f'        <DT><A HREF="{bookmark["url"]}"{add_date_attr}>{bookmark["name"]}</A>\n'
+            write(f'        <DT><A HREF="{bookmark.url}" ADD_DATE="{add_date}">{bookmark.name}</A>\n')
 
-        html_content += '''    </DL><p>
+        f.write('''    </DL><p>
 </DL><p>
-'''
+''')
 
-        # 写入文件
+    @staticmethod
+    def generate_index_html(categories, output_file, icons=None, search=False):
+        """生成主索引文件（icons 覆盖内置的分类图标）"""
         with open(output_file, 'w', encoding=Config.ENCODING) as f:
-            f.write(html_content)
+            f.write(HTMLGenerator.render_index_html(categories, icons, search))
 
     @staticmethod
-    def generate_index_html(categories, output_file):
-        """生成主索引文件"""
+    def render_index_html(categories, icons=None, search=False):
+        """返回主索引页面的HTML文本；search 为真时加入搜索框，按需加载各分类的索引分片"""
         html_content = '''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -417,6 +1039,18 @@ class HTMLGenerator:
             text-align: center;
         }
 
+        .category-parts {
+            margin-top: 15px;
+            text-align: center;
+            line-height: 1.8;
+        }
+
+        .category-parts a {
+            display: block;
+            color: #667eea;
+            text-decoration: none;
+        }
+
         .footer {
             text-align: center;
             margin-top: 50px;
@@ -436,7 +1070,7 @@ class HTMLGenerator:
         .stats h2 {
             margin-bottom: 10px;
         }
-    </style>
+{search_style}    </style>
 </head>
 <body>
     <div class="container">
@@ -447,56 +1081,55 @@ class HTMLGenerator:
             <h2>统计信息</h2>
             <p>共有 <strong>{total_bookmarks}</strong> 个书签，分为 <strong>{total_categories}</strong> 个类别</p>
         </div>
-
+{search_box}
         <div class="categories">
 '''
 
-        # 为每个分类添加图标（匹配新的分类名称）
-        category_icons = {
-            'AI/ML': '🤖',
-            'Programming': '💻',
-            'Python': '🐍',
-            'Web & JS': '🌐',
-            'C/C++ & Systems': '⚙️',
-            'Unreal Engine & Game Dev': '🎮',
-            'Linux & DevOps': '🐧',
-            'Tools & Productivity': '🛠️',
-            'Tech Communities': '💬',
-            'Docs & Specs': '📚',
-            'Gaming': '🎲',
-            'Cryptocurrency': '₿',
-            'Video & Learning': '🎥',
-            'Design & Art': '🎨',
-            'Tech News': '📰',
-            'Shopping': '🛍️',
-            'Social Media': '📱',
-            'Jobs & Career': '💼',
-            'Other': '📂'
-        }
+        from search_index import SEARCH_BOX, SEARCH_STYLE, search_script, shard_filename
+
+        # 为每个分类添加图标
+        category_icons = {**HTMLGenerator.CATEGORY_ICONS, **(icons or {})}
 
         total_bookmarks = sum(len(bookmarks) for bookmarks in categories.values())
         total_categories = len(categories)
 
         html_content = html_content.replace('{total_bookmarks}', str(total_bookmarks))
         html_content = html_content.replace('{total_categories}', str(total_categories))
+        html_content = html_content.replace('{search_style}', SEARCH_STYLE if search else '')
+        html_content = html_content.replace('{search_box}', SEARCH_BOX if search else '')
 
         # 按书签数量排序分类
         sorted_categories = sorted(categories.items(), key=lambda x: len(x[1]), reverse=True)
 
         for category_name, bookmarks in sorted_categories:
             icon = category_icons.get(category_name, '📁')
-            # 使用相同的文件名转换逻辑确保一致性
-            safe_filename = category_name.lower().replace(' ', '_').replace('/', '_').replace('&', '_and_')
-            filename = safe_filename + '.html'
             count = len(bookmarks)
+            # 使用相同的文件名转换逻辑确保一致性
+            shards = HTMLGenerator.category_shards(category_name, count)
 
-            html_content += f'''
-            <a href="{filename}" class="category-card">
+            if len(shards) == 1:
+                html_content += f'''
+            <a href="{shards[0][0]}" class="category-card">
                 <div class="category-icon">{icon}</div>
                 <div class="category-name">{category_name}</div>
                 <div class="category-count">{count} 个书签</div>
             </a>
 '''
+                continue
+
+            # 拆分成多个文件的分类：卡片内列出每个分片及其书签数
+            parts = ''.join(
+                f'\n                    <a href="{filename}">第 {number} 部分（{end - start} 个）</a>'
+                for number, (filename, start, end) in enumerate(shards, 1))
+            html_content += f'''
+            <div class="category-card">
+                <div class="category-icon">{icon}</div>
+                <div class="category-name">{category_name}</div>
+                <div class="category-count">{count} 个书签，分为 {len(shards)} 个文件</div>
+                <div class="category-parts">{parts}
+                </div>
+            </div>
+'''
 
         html_content += '''
         </div>
@@ -506,77 +1139,432 @@ class HTMLGenerator:
             <p>Created with ❤️</p>
         </div>
     </div>
-</body>
+'''
+        if search:
+            html_content += search_script(
+                shard_filename(HTMLGenerator.category_filename(name)) for name in categories)
+        html_content += '''</body>
 </html>
 '''
+        return html_content
 
-        with open(output_file, 'w', encoding=Config.ENCODING) as f:
-            f.write(html_content)
 
+def detect_input_format(input_file, input_format='auto'):
+    """确定输入格式：auto 时按文件内容判断是 Chrome JSON 还是导出的HTML"""
+    if input_format == 'auto':
+        return 'json' if is_chrome_json(input_file) else 'html'
+    return input_format
 
-def main():
-    """主函数"""
-    # 使用配置文件中的路径
-    input_file = Config.INPUT_FILE
-    output_dir = Config.OUTPUT_DIR
-
-    # 确保输出目录存在
-    Config.ensure_output_dir()
 
-    # 显示应用信息
-    print("=" * 60)
-    print(Config.get_app_info())
-    print("=" * 60)
-    print()
+def read_bookmarks(input_file, input_format, memo=None):
+    """
+    按输入格式（'html' 或 'json'）读取全部书签
+    memo: 传给快速解析器的逐行解析缓存，多次读取同一文件时使用
+    """
+    if input_format == 'json':
+        return list(ChromeBookmarksReader.iter_file(input_file))
+    if Config.STREAMING:
+        if Config.FAST_PARSER:
+            return list(FastBookmarkParser.iter_file(input_file, memo=memo))
+        return list(BookmarkParser.iter_file(input_file))
 
-    # 读取并解析HTML文件
-    print(f"[1/4] 正在读取书签文件: {Config.get_input_file_display()}")
     with open(input_file, 'r', encoding=Config.ENCODING) as f:
         html_content = f.read()
-
-    # 解析书签
-    print("[2/4] 正在解析书签...")
     parser = BookmarkParser()
     parser.feed(html_content)
-    bookmarks = parser.bookmarks
+    return parser.bookmarks
+
+
+def iter_bookmarks(input_file, input_format):
+    """按输入格式逐个产出书签，不保留整个列表（统计模式使用）"""
+    if input_format == 'json':
+        return ChromeBookmarksReader.iter_file(input_file)
+    if Config.FAST_PARSER:
+        return FastBookmarkParser.iter_file(input_file)
+    return BookmarkParser.iter_file(input_file)
+
+
+def count_categories(bookmarks, classifier, dedup=True):
+    """
+    边读边分类，只统计各分类的书签数，不保存书签（内存只与去重用的URL索引有关）
+    去重时保留每组第一个书签，计数与完整流程一致
+    返回 ({分类: 书签数}, 读取的书签数, 合并的重复书签数)
+    """
+    counts = defaultdict(int)
+    seen = set()
+    total = removed = 0
+    classify = classifier.classify_bookmark
+    for bookmark in bookmarks:
+        total += 1
+        if dedup:
+            key = normalize_url(bookmark.url)
+            if key in seen:
+                removed += 1
+                continue
+            seen.add(key)
+        counts[classify(bookmark)] += 1
+    return counts, total, removed
+
+
+def print_category_counts(counts):
+    """按书签数从多到少打印分类统计，counts 为 {分类: 书签数}"""
+    print("分类统计:")
+    print("-" * 60)
+    for category, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {category:20s} : {count:5d} 个书签")
+    print("-" * 60)
+
+
+def run_stats(input_file, input_format='auto', rules_file=None, engine=None, folder_weight=None,
+              dedup=True, as_json=False):
+    """
+    统计模式：流式读取输入（目录或通配符时依次读取每个文件）并分类，只打印各分类的书签数
+    不创建输出目录，不读写任何缓存文件；as_json 时输出一行 JSON，便于脚本处理
+    """
+    from bookmark_merge import expand_inputs, is_multi_input
+
+    start = time.perf_counter()
+    input_files = expand_inputs(input_file) if is_multi_input(input_file) else [input_file]
+    try:
+        rules = BookmarkClassifier.load_rules(rules_file, cache_dir=None)
+    except RulesError as e:
+        print(f"[错误] 规则文件格式错误: {e}", file=sys.stderr)
+        return None
+    classifier = BookmarkClassifier(engine=engine, rules=rules, folder_weight=folder_weight,
+                                    rules_cache_dir=None)
+    bookmarks = chain.from_iterable(iter_bookmarks(path, detect_input_format(path, input_format))
+                                    for path in input_files)
+    counts, total, removed = count_categories(bookmarks, classifier, dedup)
+    elapsed = time.perf_counter() - start
+
+    if as_json:
+        import json
+        print(json.dumps({'files': len(input_files), 'bookmarks': total, 'duplicates': removed,
+                          'categories': dict(sorted(counts.items(), key=lambda x: x[1], reverse=True)),
+                          'seconds': round(elapsed, 3)}, ensure_ascii=False))
+        return counts
+    print(f"读取 {len(input_files)} 个文件，共 {total} 个书签"
+          + (f"，合并重复书签 {removed} 个" if dedup else ""))
+    print_category_counts(counts)
+    print(f"耗时 {elapsed:.2f} s（{total / elapsed if elapsed else 0:,.0f} 个/秒）")
+    return counts
+
+
+def parse_args(argv=None, prog=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog=prog, description=Config.get_app_info())
+    parser.add_argument('--input', default=None,
+                        help='输入文件：Chrome导出的HTML或配置目录下的 Bookmarks JSON（默认: Config.INPUT_FILE）；'
+                             '也可以是目录或通配符（如 "exports/*.html"），并行解析全部文件后合并分类')
+    parser.add_argument('--output', default=None, metavar='DIR',
+                        help='输出目录（默认: Config.OUTPUT_DIR）')
+    parser.add_argument('--input-format', choices=('auto', 'html', 'json'),
+                        default=Config.INPUT_FORMAT,
+                        help='输入格式，auto 按文件内容判断（默认: %(default)s）')
+    parser.add_argument('--chrome-profile', nargs='?', const='Default', default=None,
+                        metavar='PROFILE',
+                        help='直接读取本机 Chrome 配置目录（默认 Default）下的 Bookmarks 文件')
+    parser.add_argument('--stats-only', action='store_true',
+                        help='只流式读取并分类，打印各分类的书签数，不写出任何文件')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='不显示开头和结尾的横幅')
+    parser.add_argument('--rules', default=None, metavar='PATH',
+                        help='分类规则文件（YAML 或 JSON，默认: Config.RULES_FILE，未设置时使用内置规则）')
+    parser.add_argument('--export-rules', default=None, metavar='PATH',
+                        help='将当前规则导出为 YAML / JSON 文件后退出，可作为自定义规则的起点')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='不合并重复书签')
+    parser.add_argument('--merge-workers', type=int, default=Config.MERGE_WORKERS,
+                        help='多文件合并模式下并行解析的进程数（默认: CPU核数）')
+    parser.add_argument('--folder-scoring', dest='folder_weight', nargs='?', type=float,
+                        const=Config.FOLDER_WEIGHT, default=None, metavar='WEIGHT',
+                        help='把所在文件夹路径的关键词得分（乘以权重，默认 %s）计入分类，'
+                             '0 表示关闭（默认: Config.FOLDER_SCORING）' % Config.FOLDER_WEIGHT)
+    parser.add_argument('--workers', type=int, default=Config.WORKERS,
+                        help='分类使用的进程数（默认: %(default)s）')
+    parser.add_argument('--engine', choices=BookmarkClassifier.ENGINES,
+                        default=Config.MATCH_ENGINE,
+                        help='关键词匹配引擎（默认: %(default)s）')
+    parser.add_argument('--output-workers', type=int, default=Config.OUTPUT_WORKERS,
+                        help='并发写出文件的线程数（默认: %(default)s）')
+    parser.add_argument('--cache', default=None,
+                        help='分类缓存文件路径（默认: 输出目录下的 %s）' % Config.CACHE_FILENAME)
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用分类缓存，重新分类全部书签')
+    parser.add_argument('--watch', action='store_true',
+                        help='持续监视输入文件，变化时只重新分类改动的书签并只重写内容变化的文件')
+    parser.add_argument('--watch-interval', type=float, default=Config.WATCH_INTERVAL,
+                        help='监视模式检查文件修改时间的间隔秒数（默认: %(default)s）')
+    parser.add_argument('--no-search', action='store_true',
+                        help='不生成索引页的搜索框和搜索索引分片')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='确定性输出：使用稳定的时间戳，并跳过内容未变化的文件（默认: Config.DETERMINISTIC_OUTPUT）')
+    parser.add_argument('--explain', nargs='?', const=True, default=None, metavar='PATH',
+                        help='记录每个书签命中的关键词、各分类得分和平分决策，写出解释表（默认: 输出目录下的 %s）'
+                             '并报告命中最多和从未命中的关键词' % Config.EXPLAIN_FILENAME)
+    parser.add_argument('--save-snapshot', nargs='?', const=True, default=None, metavar='PATH',
+                        help='分类后把书签和分类结果保存为二进制快照（默认: 输出目录下的 %s）' % Config.SNAPSHOT_FILENAME)
+    parser.add_argument('--from-snapshot', nargs='?', const=True, default=None, metavar='PATH',
+                        help='直接加载快照生成输出，跳过解析和分类（只修改了输出格式时使用）')
+    parser.add_argument('--profile', action='store_true',
+                        help='记录每个阶段的耗时、CPU时间、常驻内存（开始/结束和阶段峰值）和关键词匹配开销')
+    parser.add_argument('--profile-heap', action='store_true',
+                        help='同时用 tracemalloc 记录各阶段的 Python 堆峰值（计时会明显变慢，隐含 --profile）')
+    parser.add_argument('--profile-report', default=None,
+                        help='剖析结果JSON路径（默认: 输出目录下的 %s）' % Config.PROFILE_REPORT)
+    parser.add_argument('--cprofile', default=None, metavar='PATH',
+                        help='同时用 cProfile 记录整个运行过程并保存到 PATH（隐含 --profile）')
+    args = parser.parse_args(argv)
+    if args.cprofile or args.profile_heap:
+        # 单独指定这两个选项时不会静默失效
+        args.profile = True
+    if args.from_snapshot:
+        # 快照模式跳过解析和分类，这些选项不会生效
+        ignored = [option for option, value in (('--explain', args.explain), ('--save-snapshot', args.save_snapshot),
+                                                ('--watch', args.watch)) if value]
+        if ignored:
+            parser.error(f"--from-snapshot 跳过解析和分类，不能与 {' / '.join(ignored)} 同时使用")
+    return args
+
+
+def parse_and_classify(args, input_file, rules, merger, profiler):
+    """读取、去重并分类输入文件，返回 (书签列表, {分类: [书签]}, 分类器)"""
+    # 读取并解析HTML文件
+    print(f"[1/4] 正在读取书签文件: {input_file or Config.get_input_file_display()}")
+    input_format = None if merger else detect_input_format(input_file, args.input_format)
+    with profiler.stage('parse') as stage:
+        if merger:
+            print(f"[2/4] 正在用 {merger.parallel_workers()} 个进程解析 {len(merger.input_files)} 个文件...")
+            bookmarks = merger.read_all()
+        else:
+            if input_format == 'json':
+                # Chrome 原生 Bookmarks 文件，无需手动导出
+                print("[2/4] 正在读取Chrome书签JSON...")
+            elif Config.STREAMING:
+                # 分块读取，边读边解析，不保留图标数据
+                print("[2/4] 正在流式解析书签...")
+            else:
+                print("[2/4] 正在解析书签...")
+            bookmarks = read_bookmarks(input_file, input_format)
+        stage['items'] = len(bookmarks)
+    if merger:
+        merger.report()
     print(f"      找到 {len(bookmarks)} 个书签")
+    if Config.DEDUP and not args.no_dedup:
+        with profiler.stage('dedup') as stage:
+            stage['items'] = len(bookmarks)
+            deduplicator = BookmarkDeduplicator()
+            bookmarks = deduplicator.deduplicate(bookmarks)
+        print(f"      合并重复书签 {deduplicator.removed} 个，剩余 {len(bookmarks)} 个")
     print()
 
     # 分类书签
     print("[3/4] 正在智能分类书签...")
-    classifier = BookmarkClassifier()
-    classified_bookmarks = classifier.classify_all(bookmarks)
+    use_cache = not (args.no_cache or not Config.USE_CACHE)
+    if args.explain:
+        if args.workers > 1 or use_cache:
+            print("      解释模式不使用分类缓存和多进程")
+    elif args.workers > 1 and not use_cache:
+        print(f"      使用 {args.workers} 个进程")
+    with profiler.stage('classify') as stage:
+        classifier = BookmarkClassifier(engine=args.engine, rules=rules, folder_weight=args.folder_weight)
+        if rules.digest is not None:
+            state = '使用已缓存的编译结果' if rules.loaded_from_cache else '已编译并缓存'
+            print(f"      规则文件: {args.rules or Config.RULES_FILE}（{state}）")
+        if args.explain:
+            # 解释模式需要每个书签的命中关键词，不使用缓存和多进程
+            from classification_explain import ClassificationExplanation
+            explanation = ClassificationExplanation(classifier.matcher, rules.priorities,
+                                                    classifier.folder_scores)
+            for bookmark, category in zip(bookmarks, classifier.classify_explained(bookmarks, explanation)):
+                classifier.classified_bookmarks[category].append(bookmark)
+            classified_bookmarks = classifier.classified_bookmarks
+        elif not use_cache:
+            classified_bookmarks = classifier.classify_all(bookmarks, workers=args.workers)
+        else:
+            from classification_cache import ClassificationCache
+            cache_file = args.cache or Config.get_cache_file()
+            with ClassificationCache(cache_file, classifier.rules_version(),
+                                     include_folders=classifier.folder_scores is not None) as cache:
+                classified_bookmarks = classifier.classify_all(
+                    bookmarks, workers=args.workers, cache=cache)
+            # 多进程只用于缓存未命中的书签
+            workers = f"用 {args.workers} 个进程" if args.workers > 1 and cache.misses else ''
+            print(f"      缓存命中 {cache.hits} 个，{workers}重新分类 {cache.misses} 个")
+        stage['items'] = len(bookmarks)
+    host_stats = classifier.host_memo_stats()
+    if host_stats and (args.workers <= 1 or args.explain):
+        hits, misses, size = host_stats
+        total = hits + misses
+        if total:
+            print(f"      主机名缓存命中率 {hits / total:.1%}（{size} 个主机）")
+    if args.explain:
+        explain_file = args.explain if isinstance(args.explain, str) else Config.get_explain_file()
+        explanation.write_tsv(explain_file, bookmarks, Config.ENCODING)
+        print(f"      分类解释已写入: {explain_file}")
+        print()
+        explanation.print_report(Config.EXPLAIN_TOP)
+
+    return bookmarks, classified_bookmarks, classifier
+
+
+def load_snapshot(snapshot_file, rules, engine, profiler, folder_weight=None):
+    """从快照加载已分类的书签，跳过解析和分类，返回值与 parse_and_classify 相同（分类器为 None）"""
+    from bookmark_snapshot import BookmarkSnapshot
+
+    print(f"[1/4] 正在加载书签快照: {snapshot_file}")
+    with profiler.stage('load') as stage:
+        with BookmarkSnapshot(snapshot_file) as snapshot:
+            classified_bookmarks = snapshot.classified()
+            saved_version = snapshot.rules_version
+        bookmarks = list(chain.from_iterable(classified_bookmarks.values()))
+        stage['items'] = len(bookmarks)
+    print(f"      找到 {len(bookmarks)} 个已分类的书签")
+    if saved_version != BookmarkClassifier.version_of(rules, engine, folder_weight):
+        print("      [提示] 快照中的分类结果来自不同的规则、匹配引擎或文件夹评分设置，重新解析输入文件才会按当前规则分类")
+    return bookmarks, classified_bookmarks, None
+
+
+def main(argv=None, prog=None):
+    """主函数"""
+    args = parse_args(argv, prog)
+
+    # 命令行参数优先，未指定时使用配置文件中的路径
+    input_file = args.input or Config.INPUT_FILE
+    if args.chrome_profile:
+        input_file = default_bookmarks_file(args.chrome_profile)
+    if args.output:
+        Config.OUTPUT_DIR = args.output
+    output_dir = Config.OUTPUT_DIR
+
+    if args.stats_only:
+        # 不创建输出目录、不写规则缓存和分类缓存
+        run_stats(input_file, args.input_format, rules_file=args.rules or Config.RULES_FILE,
+                  engine=args.engine, folder_weight=args.folder_weight,
+                  dedup=Config.DEDUP and not args.no_dedup)
+        return
+
+    try:
+        rules = BookmarkClassifier.load_rules(args.rules or Config.RULES_FILE)
+    except RulesError as e:
+        print(f"[错误] 规则文件格式错误: {e}")
+        return
+    if args.export_rules:
+        # 导出时带上内置图标，得到完整的规则文件
+        RuleSet(rules.categories, rules.weights, rules.priorities,
+                {**HTMLGenerator.CATEGORY_ICONS, **rules.icons}).write(args.export_rules)
+        print(f"规则已导出到: {args.export_rules}")
+        return
+
+    from output_manifest import OutputManifest, remove_stale_outputs
+    from profiler import PipelineProfiler
+
+    # 确保输出目录存在
+    Config.ensure_output_dir()
+
+    # 显示应用信息
+    if not args.quiet:
+        print("=" * 60)
+        print(Config.get_app_info())
+        print("=" * 60)
+        print()
+
+    # 确定性输出：稳定的时间戳 + 按内容哈希跳过未变化的文件
+    manifest = None
+    if args.deterministic or Config.DETERMINISTIC_OUTPUT:
+        manifest = OutputManifest(output_dir, Config.ENCODING)
+
+    # 输入为目录或通配符时，并行解析全部导出文件后合并
+    from bookmark_merge import ExportMerger, expand_inputs, is_multi_input
+    merger = None
+    if is_multi_input(input_file):
+        input_files = expand_inputs(input_file)
+        if not input_files:
+            print(f"[错误] 没有找到书签文件: {input_file}")
+            return
+        if args.watch:
+            print("[错误] 监视模式只支持单个输入文件")
+            return
+        merger = ExportMerger(input_files, args.input_format, args.merge_workers)
+
+    if args.watch:
+        from bookmark_watcher import BookmarkWatcher
+        watcher = BookmarkWatcher(
+            input_file, output_dir,
+            BookmarkClassifier(engine=args.engine, rules=rules, folder_weight=args.folder_weight),
+            input_format=args.input_format, dedup=Config.DEDUP and not args.no_dedup,
+            output_workers=args.output_workers, manifest=manifest,
+            search=False if args.no_search else None)
+        watcher.run(args.watch_interval)
+        return
+
+    profiler = PipelineProfiler(args.profile, args.cprofile, heap=args.profile_heap)
+    profiler.start()
+
+    if args.from_snapshot:
+        snapshot_file = args.from_snapshot if isinstance(args.from_snapshot, str) else Config.get_snapshot_file()
+        bookmarks, classified_bookmarks, classifier = load_snapshot(snapshot_file, rules, args.engine, profiler,
+                                                                    args.folder_weight)
+    else:
+        bookmarks, classified_bookmarks, classifier = parse_and_classify(args, input_file, rules, merger, profiler)
+        if args.save_snapshot:
+            snapshot_file = args.save_snapshot if isinstance(args.save_snapshot, str) else Config.get_snapshot_file()
+            from bookmark_snapshot import write_snapshot
+            with profiler.stage('snapshot') as stage:
+                write_snapshot(snapshot_file, classified_bookmarks, classifier.rules_version())
+                stage['items'] = len(bookmarks)
+            print(f"      快照已保存到: {snapshot_file}")
 
     # 显示分类统计
     print()
-    print("分类统计:")
-    print("-" * 60)
-    for category, bookmarks_list in sorted(classified_bookmarks.items(),
-                                          key=lambda x: len(x[1]),
-                                          reverse=True):
-        print(f"  {category:20s} : {len(bookmarks_list):5d} 个书签")
-    print("-" * 60)
+    print_category_counts({category: len(items) for category, items in classified_bookmarks.items()})
     print()
 
     # 生成HTML文件
     print("[4/4] 正在生成HTML文件...")
     generator = HTMLGenerator()
 
-    # 为每个分类生成HTML
-    for category_name, bookmarks_list in classified_bookmarks.items():
-        # 将分类名转换为安全的文件名（替换特殊字符）
-        safe_filename = category_name.lower().replace(' ', '_').replace('/', '_').replace('&', '_and_')
-        filename = safe_filename + '.html'
-        output_file = os.path.join(output_dir, filename)
-        generator.generate_category_html(category_name, bookmarks_list, output_file)
-        print(f"      生成: {filename}")
-
-    # 生成索引文件
-    index_file = os.path.join(output_dir, 'index.html')
-    generator.generate_index_html(classified_bookmarks, index_file)
-    print(f"      生成: index.html (主索引)")
+    # 并发生成所有分类文件和主索引
+    start = time.perf_counter()
+    with profiler.stage('generate') as stage:
+        written = generator.generate_all(classified_bookmarks, output_dir,
+                                         workers=args.output_workers, icons=rules.icons,
+                                         manifest=manifest, search=False if args.no_search else None)
+        # 分类消失或拆分的文件数变化后，删除上次生成、这次不再生成的旧文件
+        stale = remove_stale_outputs(output_dir, generator.output_files(
+            classified_bookmarks, search=False if args.no_search else None), manifest)
+        stage['items'] = len(bookmarks)
+    for filename, elapsed in written:
+        label = 'index.html (主索引)' if filename == 'index.html' else filename
+        print(f"      生成: {label}  {elapsed * 1000:.1f} ms")
+    for filename in stale:
+        print(f"      删除: {filename}")
+    if manifest is not None:
+        print(f"      写入 {len(manifest.written)} 个文件，内容未变化跳过 {len(manifest.skipped)} 个，"
+              f"总耗时 {time.perf_counter() - start:.2f} s")
+    else:
+        print(f"      共 {len(written)} 个文件，总耗时 {time.perf_counter() - start:.2f} s")
     print()
 
+    profiler.stop()
+    if args.profile:
+        # 在样本上测量实际引擎的分类耗时，再逐个关键词估算子串匹配开销，找出代价最高的规则
+        sample = bookmarks[:Config.PROFILE_SAMPLE]
+        if classifier is None:
+            classifier = BookmarkClassifier(engine=args.engine, rules=rules, folder_weight=args.folder_weight)
+        profiler.measure_engine(classifier.engine, classifier.classify_bookmark, sample)
+        profiler.measure_keywords(rules.categories,
+                                  [BookmarkClassifier.build_search_text(b) for b in sample])
+        profiler.print_report()
+        report_file = args.profile_report or os.path.join(output_dir, Config.PROFILE_REPORT)
+        profiler.write_report(report_file, input_file=input_file, bookmarks=len(bookmarks),
+                              engine=args.engine, workers=args.workers)
+        print(f"剖析报告已写入: {report_file}")
+        print()
+
+    if args.quiet:
+        print(f"[OK] 完成：{len(bookmarks)} 个书签，输出目录 {Config.get_output_dir_display()}")
+        return
     print("=" * 60)
     print("[OK] 完成！所有文件已生成到:")
     print(f"  {Config.get_output_dir_display()}")
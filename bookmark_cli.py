@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行入口
+    python bookmark_cli.py classify [选项]   完整流程：解析、去重、分类、生成HTML（选项同 bookmark_classifier.py）
+    python bookmark_cli.py stats [选项]      流式统计各分类的书签数，不写任何文件
+    python bookmark_cli.py dedup [选项]      流式统计重复书签
+    python bookmark_cli.py bench <子命令>    性能基准（同 benchmark.py）
+本模块只导入 argparse 和配置，各子命令运行时才导入各自需要的模块，
+脚本和定时任务中调用 stats / dedup 时不必加载输出、缓存和 numpy 等模块。
+"""
+
+import argparse
+import sys
+
+from config import Config
+
+# 选项原样转交给其他脚本解析的子命令
+PASSTHROUGH = ('classify', 'bench')
+
+
+def cmd_classify(args, extra):
+    from bookmark_classifier import main
+    main(extra, prog='bookmark_cli.py classify')
+
+
+def cmd_bench(args, extra):
+    from benchmark import main
+    main(extra, prog='bookmark_cli.py bench')
+
+
+def cmd_stats(args, extra):
+    from bookmark_classifier import run_stats
+    run_stats(args.input or Config.INPUT_FILE, args.input_format, rules_file=args.rules or Config.RULES_FILE,
+              engine=args.engine, folder_weight=args.folder_weight,
+              dedup=Config.DEDUP and not args.no_dedup, as_json=args.json)
+
+
+def cmd_dedup(args, extra):
+    from collections import Counter
+    from itertools import chain
+    from bookmark_classifier import detect_input_format, iter_bookmarks
+    from bookmark_dedup import normalize_url
+    from bookmark_merge import expand_inputs, is_multi_input
+
+    input_file = args.input or Config.INPUT_FILE
+    input_files = expand_inputs(input_file) if is_multi_input(input_file) else [input_file]
+    bookmarks = chain.from_iterable(iter_bookmarks(path, detect_input_format(path, args.input_format))
+                                    for path in input_files)
+    groups = Counter(normalize_url(bookmark.url) for bookmark in bookmarks)
+    total = sum(groups.values())
+    duplicated = [(key, count) for key, count in groups.most_common(args.top) if count > 1]
+    print(f"读取 {len(input_files)} 个文件，共 {total} 个书签，去重后 {len(groups)} 个，"
+          f"可合并 {total - len(groups)} 个")
+    if duplicated:
+        print(f"重复最多的网址（前 {args.top} 个）:")
+        for key, count in duplicated:
+            print(f"  {count:5d}  {key}")
+
+
+def add_input_arguments(parser):
+    parser.add_argument('--input', default=None,
+                        help='输入文件、目录或通配符（默认: Config.INPUT_FILE）')
+    parser.add_argument('--input-format', choices=('auto', 'html', 'json'), default=Config.INPUT_FORMAT,
+                        help='输入格式，auto 按文件内容判断（默认: %(default)s）')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bookmark_cli.py', description=Config.get_app_info())
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    classify = subparsers.add_parser('classify', add_help=False,
+                                     help='解析、去重、分类并生成HTML（选项见 classify --help）')
+    classify.set_defaults(func=cmd_classify)
+
+    stats = subparsers.add_parser('stats', help='流式读取并分类，只打印各分类的书签数，不写任何文件')
+    add_input_arguments(stats)
+    stats.add_argument('--rules', default=None, metavar='PATH', help='分类规则文件（YAML 或 JSON）')
+    stats.add_argument('--engine', choices=('substring', 'token'), default=Config.MATCH_ENGINE,
+                       help='关键词匹配引擎（默认: %(default)s）')
+    stats.add_argument('--folder-scoring', dest='folder_weight', nargs='?', type=float,
+                       const=Config.FOLDER_WEIGHT, default=None, metavar='WEIGHT',
+                       help='计入文件夹路径的关键词得分')
+    stats.add_argument('--no-dedup', action='store_true', help='不合并重复书签')
+    stats.add_argument('--json', action='store_true', help='输出一行 JSON')
+    stats.set_defaults(func=cmd_stats)
+
+    dedup = subparsers.add_parser('dedup', help='流式统计重复书签（按规范化URL），不写任何文件')
+    add_input_arguments(dedup)
+    dedup.add_argument('--top', type=int, default=20, help='列出重复次数最多的网址数（默认: %(default)s）')
+    dedup.set_defaults(func=cmd_dedup)
+
+    bench = subparsers.add_parser('bench', add_help=False, help='性能基准（子命令见 bench --help）')
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in PASSTHROUGH:
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+    args.func(args, extra)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
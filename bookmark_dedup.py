@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URL规范化与重复书签合并
+合并多次导出的书签时，同一网页常以 http/https、末尾斜杠、www./m. 前缀、utm_* 参数等
+不同形式重复出现。按规范化后的URL建立哈希索引，一次遍历完成去重。
+"""
+
+import re
+
+# 去重时忽略的跟踪参数
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+                             'mc_cid', 'mc_eid', 'spm', 'ref_src'})
+
+# 视为同一站点的主机名前缀（www.example.com、m.example.com 与 example.com 相同）
+HOST_PREFIXES = ('www.', 'm.', 'mobile.')
+
+# 协议、主机（含端口）、路径、查询参数、片段；只处理 http/https 链接
+_URL_RE = re.compile(r'(?i)https?://(?:[^/?#@]*@)?([^/?#]+)([^?#]*)(?:\?([^#]*))?(?:#(.*))?',
+                     re.DOTALL)
+_DEFAULT_PORT_RE = re.compile(r':(?:80|443)?$')
+
+
+def normalize_url(url):
+    """
+    返回用于判断重复的规范化URL（只用作索引键，不会写入输出）
+    非 http/https 链接（javascript:、chrome:// 等）仅去除首尾空白
+    """
+    url = url.strip()
+    match = _URL_RE.fullmatch(url)
+    if match is None:
+        return url
+    host, path, query, fragment = match.groups()
+
+    host = host.lower()
+    if ':' in host:
+        host = _DEFAULT_PORT_RE.sub('', host)
+    if host.startswith(HOST_PREFIXES) and host.count('.') > 1:
+        host = host.partition('.')[2]
+
+    # 协议不参与比较：http 与 https 视为同一网页
+    key = host + path.rstrip('/')
+    if query:
+        if '&' in query:
+            params = sorted(p for p in query.split('&')
+                            if p and not _is_tracking_param(p.partition('=')[0].lower()))
+            query = '&'.join(params)
+        elif _is_tracking_param(query.partition('=')[0].lower()):
+            query = ''
+        if query:
+            key += '?' + query
+    if fragment:
+        key += '#' + fragment
+    return key
+
+
+def _is_tracking_param(name):
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def _date_value(add_date):
+    try:
+        return int(add_date)
+    except (TypeError, ValueError):
+        return None
+
+
+class BookmarkDeduplicator:
+    """按规范化URL合并重复书签
+
+    保留每组中第一个出现的书签（URL和名称不变），add_date 取组内最早的时间，
+    其余书签所在的不同文件夹记录在 duplicate_paths 中。
+    normalize 可替换为带缓存的规范化函数（监视模式重复处理同一批URL）。
+    """
+
+    def __init__(self, normalize=normalize_url):
+        self.normalize = normalize
+        self.removed = 0
+
+    def deduplicate(self, bookmarks):
+        """返回去重后的书签列表（保持原有顺序），removed 累计移除的书签数"""
+        index = {}
+        unique = []
+        normalize = self.normalize
+        for bookmark in bookmarks:
+            key = normalize(bookmark.url)
+            kept = index.get(key)
+            if kept is None:
+                index[key] = bookmark
+                unique.append(bookmark)
+                continue
+
+            self.removed += 1
+            date = _date_value(bookmark.add_date)
+            kept_date = _date_value(kept.add_date)
+            if date is not None and (kept_date is None or date < kept_date):
+                kept.add_date = bookmark.add_date
+            path = bookmark.folder_path
+            if path != kept.folder_path and path not in kept.duplicate_paths:
+                kept.duplicate_paths += (path,)
+        return unique
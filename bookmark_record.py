@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的书签记录类型
+使用 __slots__ 代替字典，文件夹路径为共享的不可变元组
+"""
+
+
+class Bookmark:
+    """单个书签
+
+    folder_path 为不可变元组，同一文件夹下的书签共享同一个对象（见 PathInterner）。
+    流式解析时不保留图标，icon 为共享的空字符串。
+    duplicate_paths 为去重时合并进来的重复书签所在的其他文件夹路径。
+    为兼容旧代码，仍支持 bookmark['url'] / bookmark.get('add_date') 形式的访问。
+    书签按全部字段比较相等，但不可哈希（字段会在去重时被修改）。
+    """
+
+    __slots__ = ('url', 'name', 'add_date', 'folder_path', 'icon', 'duplicate_paths')
+
+    def __init__(self, url, name, add_date='', folder_path=(), icon='', duplicate_paths=()):
+        self.url = url
+        self.name = name
+        self.add_date = add_date
+        self.folder_path = folder_path
+        self.icon = icon
+        self.duplicate_paths = duplicate_paths
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def key(self):
+        """全部字段组成的元组，可用作字典键（比直接以书签为键少算几次哈希）"""
+        return (self.url, self.name, self.add_date, self.folder_path, self.icon,
+                self.duplicate_paths)
+
+    def __eq__(self, other):
+        if not isinstance(other, Bookmark):
+            return NotImplemented
+        return self.key() == other.key()
+
+    # 去重时会修改 duplicate_paths 等字段，按全部字段计算的哈希会随之改变，
+    # 因此书签不可哈希；需要作为字典键或放入集合时使用 key() 或 url
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Bookmark(url={self.url!r}, name={self.name!r}, folder_path={self.folder_path!r})"
+
+
+class PathInterner:
+    """文件夹路径驻留表：相同路径只保留一个元组对象"""
+
+    def __init__(self):
+        self._paths = {(): ()}
+
+    def __call__(self, path):
+        path = tuple(path)
+        return self._paths.setdefault(path, path)
+
+    def __len__(self):
+        return len(self._paths)
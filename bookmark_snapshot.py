@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书签快照
+把解析（去重）后的书签和分类结果保存为紧凑的二进制列式文件，之后只调整输出时
+直接加载快照，不必重新解析HTML和分类。
+
+文件布局（小端序，各段按 8 字节对齐）:
+    文件头      魔数、格式版本、标志位和各段长度
+    字符串表    (字符串数+1) 个 uint64 字节偏移 + UTF-8 数据；URL、名称、日期、
+                图标、文件夹名、分类名和规则版本都存为字符串序号，相同内容只存一份
+    分类表      uint32 字符串序号
+    路径表      (路径数+1) 个 uint32 偏移 + uint32 文件夹名序号
+    书签列      url / name / add_date / icon / folder_path / category 各一列 uint32
+    重复路径    (书签数+1) 个 uint32 偏移 + uint32 路径序号
+加载时用 mmap 映射文件，各列直接 cast 为 memoryview，不复制数据。
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from bookmark_record import Bookmark
+
+MAGIC = b'BKSNAP\r\n'
+# 格式版本，布局变化时递增；加载时版本不一致直接报错
+FORMAT_VERSION = 1
+
+# 所有字符串都不含 NUL 时，数据区以 NUL 分隔，整张表可以一次解码再切分
+FLAG_NUL_SEPARATED = 1
+
+# 魔数、版本、标志位、书签数、字符串数、分类数、路径数、路径项数、重复路径项数、
+# 规则版本的字符串序号（NO_STRING 表示无）、字符串数据字节数
+_HEADER = struct.Struct('<8sHHIIIIIIIQ')
+NO_STRING = 0xFFFFFFFF
+
+COLUMNS = ('url', 'name', 'add_date', 'icon', 'folder_path', 'category')
+
+
+class SnapshotError(ValueError):
+    """快照文件损坏或格式版本不匹配"""
+
+
+def _padding(size):
+    return -size % 8
+
+
+def write_snapshot(path, classified, rules_version=None):
+    """
+    保存快照：classified 为 {分类名称: [书签]}，分类和书签的顺序原样保留
+    rules_version 记录生成分类结果时的规则版本，加载时可据此提示分类结果是否过期
+    """
+    # 字符串驻留表：{字符串: 序号}，字典的插入顺序即字符串表的顺序
+    string_index = {}
+    intern = string_index.setdefault
+    path_index = {}
+    path_offsets = array('I', [0])
+    path_items = array('I')
+    columns = {name: array('I') for name in COLUMNS}
+    dup_offsets = array('I', [0])
+    dup_items = array('I')
+
+    def intern_path(folder_path):
+        number = path_index.get(folder_path)
+        if number is None:
+            number = path_index[folder_path] = len(path_index)
+            path_items.extend(intern(folder, len(string_index)) for folder in folder_path)
+            path_offsets.append(len(path_items))
+        return number
+
+    categories = array('I', (intern(name, len(string_index)) for name in classified))
+    url, name, add_date = columns['url'], columns['name'], columns['add_date']
+    icon, folder, category = columns['icon'], columns['folder_path'], columns['category']
+    for number, bookmarks in enumerate(classified.values()):
+        for bookmark in bookmarks:
+            url.append(intern(bookmark.url, len(string_index)))
+            name.append(intern(bookmark.name, len(string_index)))
+            add_date.append(intern(bookmark.add_date, len(string_index)))
+            icon.append(intern(bookmark.icon, len(string_index)))
+            folder.append(intern_path(bookmark.folder_path))
+            category.append(number)
+            if bookmark.duplicate_paths:
+                dup_items.extend(intern_path(p) for p in bookmark.duplicate_paths)
+            dup_offsets.append(len(dup_items))
+    version = NO_STRING if rules_version is None else intern(rules_version, len(string_index))
+
+    strings = list(string_index)
+    text = '\0'.join(strings)
+    flags = FLAG_NUL_SEPARATED if text.count('\0') == len(strings) - 1 else 0
+    separator = 1 if flags & FLAG_NUL_SEPARATED else 0
+    blob = (text + '\0' if separator else ''.join(strings)).encode('utf-8')
+    # ASCII 字符串的字符数即字节数，只有非 ASCII 字符串需要编码后计算长度
+    string_offsets = array('Q', accumulate(
+        ((len(s) if s.isascii() else len(s.encode('utf-8'))) + separator for s in strings), initial=0))
+
+    sections = [string_offsets, blob, categories, path_offsets, path_items,
+                *(columns[name] for name in COLUMNS), dup_offsets, dup_items]
+    if sys.byteorder != 'little':
+        for section in sections:
+            if isinstance(section, array):
+                section.byteswap()
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(url), len(strings), len(categories),
+                             len(path_offsets) - 1, len(path_items), len(dup_items), version, len(blob)))
+        f.write(b'\0' * _padding(_HEADER.size))
+        for section in sections:
+            data = section if isinstance(section, bytes) else section.tobytes()
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+    os.replace(tmp_path, path)
+
+
+class BookmarkSnapshot:
+    """只读快照
+
+    with BookmarkSnapshot(path) as snapshot:
+        snapshot[i]            # 第 i 个书签（按需构建 Bookmark）
+        snapshot.category(i)   # 第 i 个书签的分类
+        snapshot.classified()  # {分类名称: [书签]}，与保存时相同
+    列数据（snapshot.columns['url'] 等）是直接映射文件内容的 memoryview。
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # 空文件无法映射
+                raise SnapshotError(f"快照文件为空: {path}") from None
+        self._views = []
+        try:
+            self._load(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self, path):
+        buffer = self._view(memoryview(self._mmap))
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError(f"快照文件不完整: {path}")
+        (magic, version, self.flags, count, string_count, category_count, path_count,
+         path_item_count, dup_item_count, rules_string, blob_size) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"不是书签快照文件: {path}")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"快照格式版本 {version} 与当前版本 {FORMAT_VERSION} 不一致，请重新生成: {path}")
+
+        self._offset = _HEADER.size + _padding(_HEADER.size)
+
+        def take(typecode, length):
+            size = length if typecode is None else length * array(typecode).itemsize
+            start = self._offset
+            if start + size > len(buffer):
+                raise SnapshotError(f"快照文件不完整: {path}")
+            self._offset = start + size + _padding(size)
+            section = buffer[start:start + size]
+            if typecode is None:
+                return self._view(section)
+            if sys.byteorder != 'little':
+                # 大端平台无法直接映射，复制一份再转换字节序
+                values = array(typecode)
+                values.frombytes(section)
+                values.byteswap()
+                return values
+            return self._view(section.cast(typecode))
+
+        self._string_offsets = take('Q', string_count + 1)
+        self._blob = take(None, blob_size)
+        self._categories = take('I', category_count)
+        self._path_offsets = take('I', path_count + 1)
+        self._path_items = take('I', path_item_count)
+        self.columns = {name: take('I', count) for name in COLUMNS}
+        self._dup_offsets = take('I', count + 1)
+        self._dup_items = take('I', dup_item_count)
+
+        self._strings = None
+        self._paths = {}
+        self.categories = [self.string(i) for i in self._categories]
+        self.rules_version = None if rules_string == NO_STRING else self.string(rules_string)
+
+    def _view(self, view):
+        self._views.append(view)
+        return view
+
+    def __len__(self):
+        return len(self._dup_offsets) - 1
+
+    def string(self, number):
+        """按序号读取一个字符串，只解码这一个"""
+        if self._strings is not None:
+            return self._strings[number]
+        end = self._string_offsets[number + 1]
+        if self.flags & FLAG_NUL_SEPARATED:
+            end -= 1
+        return str(self._blob[self._string_offsets[number]:end], 'utf-8')
+
+    def strings(self):
+        """解码全部字符串（结果缓存，之后 string() 直接查表）"""
+        if self._strings is None:
+            if self.flags & FLAG_NUL_SEPARATED:
+                self._strings = str(self._blob, 'utf-8').split('\0')[:-1]
+            else:
+                self._strings = [self.string(i) for i in range(len(self._string_offsets) - 1)]
+        return self._strings
+
+    def folder_path(self, number):
+        """路径序号对应的文件夹路径元组（同一路径只构建一次）"""
+        path = self._paths.get(number)
+        if path is None:
+            items = self._path_items[self._path_offsets[number]:self._path_offsets[number + 1]]
+            path = self._paths[number] = tuple(self.string(i) for i in items)
+        return path
+
+    def category(self, index):
+        return self.categories[self.columns['category'][index]]
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        index %= len(self)
+        columns = self.columns
+        string = self.string
+        dups = self._dup_items[self._dup_offsets[index]:self._dup_offsets[index + 1]]
+        return Bookmark(string(columns['url'][index]), string(columns['name'][index]),
+                        string(columns['add_date'][index]), self.folder_path(columns['folder_path'][index]),
+                        string(columns['icon'][index]), tuple(self.folder_path(p) for p in dups))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def classified(self):
+        """全部书签按保存时的分类和顺序分组，返回 {分类名称: [书签]}"""
+        strings = self.strings()
+        result = {name: [] for name in self.categories}
+        groups = [result[name] for name in self.categories]
+        columns = self.columns
+        paths = [self.folder_path(i) for i in range(len(self._path_offsets) - 1)]
+        dup_offsets, dup_items = self._dup_offsets.tolist(), self._dup_items.tolist()
+        for index, (url, name, add_date, icon, folder, category) in enumerate(zip(
+                *(columns[column].tolist() for column in COLUMNS))):
+            start, end = dup_offsets[index], dup_offsets[index + 1]
+            groups[category].append(Bookmark(
+                strings[url], strings[name], strings[add_date], paths[folder], strings[icon],
+                tuple(paths[p] for p in dup_items[start:end]) if start != end else ()))
+        return result
+
+    def close(self):
+        """释放映射；之前取得的 memoryview 列在关闭后不可再用"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
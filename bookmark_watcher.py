@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监视模式
+常驻内存保存上一次的书签和分类结果。输入文件变化时与旧书签逐个比对，
+只对新增或修改的书签重新分类，只重写内容有变化的分类文件和 index.html
+"""
+
+import os
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from config import Config
+from bookmark_classifier import HTMLGenerator, detect_input_format, read_bookmarks
+from bookmark_dedup import BookmarkDeduplicator, normalize_url
+from output_manifest import remove_stale_outputs
+
+
+class BookmarkWatcher:
+    """轮询输入文件的修改时间，增量更新输出目录"""
+
+    def __init__(self, input_file, output_dir, classifier, input_format='auto', dedup=True,
+                 output_workers=None, manifest=None, search=None):
+        self.input_file = input_file
+        self.output_dir = output_dir
+        self.classifier = classifier
+        self.input_format = input_format
+        self.dedup = dedup
+        self.output_workers = output_workers
+        self.manifest = manifest
+        # 是否生成搜索索引分片和搜索框（None 表示 Config.SEARCH_INDEX）
+        self.search = Config.SEARCH_INDEX if search is None else search
+
+        self.categories = {}        # 书签 key() -> (书签对象, 分类)，未变化的书签沿用旧对象和旧分类
+        self.classified = {}        # 分类名称 -> 书签列表（与上次输出一致）
+
+        # 未变化的书签行和URL不再重复解析、规范化
+        self.line_memo = {}
+        self.normalize = lru_cache(maxsize=None)(normalize_url)
+
+    def file_state(self):
+        """用于判断文件是否变化的 (修改时间, 大小)，文件暂时不存在时返回 None"""
+        try:
+            st = os.stat(self.input_file)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def update(self):
+        """
+        重新读取输入文件并增量更新输出（修改过的书签按一个新增、一个删除计）
+        返回 (重新分类的书签数, 已不存在的旧书签数, 重写的文件列表)
+        """
+        bookmarks = read_bookmarks(self.input_file,
+                                   detect_input_format(self.input_file, self.input_format),
+                                   memo=self.line_memo)
+        if self.dedup:
+            bookmarks = BookmarkDeduplicator(self.normalize).deduplicate(bookmarks)
+
+        # 与上次的书签比对：相同的书签沿用旧对象，后面可以按对象身份快速比较分类列表
+        previous = self.categories
+        keys = [bookmark.key() for bookmark in bookmarks]
+        resolved = []
+        pending = []
+        for bookmark, key in zip(bookmarks, keys):
+            entry = previous.get(key)
+            if entry is None:
+                pending.append(len(resolved))
+                resolved.append((bookmark, None))
+            else:
+                resolved.append(entry)
+
+        if pending:
+            results = self.classifier.classify_many([resolved[i][0] for i in pending])
+            for i, category in zip(pending, results):
+                resolved[i] = (resolved[i][0], category)
+
+        categories = dict(zip(keys, resolved))
+        classified = defaultdict(list)
+        for bookmark, category in resolved:
+            classified[category].append(bookmark)
+        removed = len(previous.keys() - categories.keys())
+
+        # 列表中的对象沿用旧对象时，== 比较先按身份判断，代价很小
+        dirty = {name for name, items in classified.items()
+                 if self.classified.get(name) != items}
+        # 索引页只取决于各分类的名称、顺序和书签数
+        write_index = ([(k, len(v)) for k, v in classified.items()]
+                       != [(k, len(v)) for k, v in self.classified.items()])
+
+        written = []
+        if dirty or write_index:
+            written = HTMLGenerator.generate_all(
+                classified, self.output_dir, workers=self.output_workers,
+                icons=self.classifier.rules.icons, only=dirty, index=write_index,
+                manifest=self.manifest, search=self.search)
+        # 分类消失或拆分的文件数变化后，多出来的旧文件需要删除（与普通运行共用文件列表）
+        remove_stale_outputs(self.output_dir, HTMLGenerator.output_files(classified, self.search),
+                             self.manifest)
+
+        self.categories = categories
+        self.classified = dict(classified)
+        if len(self.line_memo) > 2 * len(bookmarks) + 1000:
+            # 删改过的旧行累积过多时清空，下次重新建立
+            self.line_memo.clear()
+            self.normalize.cache_clear()
+        return len(pending), removed, [filename for filename, _ in written]
+
+    def run(self, interval=None):
+        """首次完整生成，之后每隔 interval 秒检查一次文件，直到 Ctrl+C"""
+        interval = interval or Config.WATCH_INTERVAL
+        print(f"监视模式: {self.input_file}（每 {interval:g} 秒检查一次，Ctrl+C 退出）")
+        state = self.file_state()
+        self.report(time.perf_counter(), *self.update())
+
+        try:
+            while True:
+                time.sleep(interval)
+                current = self.file_state()
+                if current is None or current == state:
+                    continue
+                # 导出文件可能仍在写入：等到修改时间和大小不再变化后再读取
+                time.sleep(interval)
+                if self.file_state() != current:
+                    continue
+                state = current
+                start = time.perf_counter()
+                try:
+                    self.report(start, *self.update())
+                except (OSError, ValueError) as e:
+                    print(f"[错误] 更新失败，保留上次的输出: {e}")
+        except KeyboardInterrupt:
+            print("已退出监视模式")
+
+    def report(self, start, added, removed, written):
+        elapsed = time.perf_counter() - start
+        total = sum(len(items) for items in self.classified.values())
+        print(f"[{time.strftime('%H:%M:%S')}] 共 {total} 个书签：新增/修改 {added} 个，删除 {removed} 个，"
+              f"重写 {len(written)} 个文件，耗时 {elapsed * 1000:.0f} ms")
+        for filename in written:
+            print(f"      更新: {filename}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分类结果持久化缓存
+以 (url, name, 规则版本) 的哈希为键保存分类结果，重复运行时只对新增或修改的书签重新分类
+"""
+
+import hashlib
+import json
+
+
+def rules_version(categories, *extra):
+    """计算分类规则的版本号（分类顺序影响平分结果，因此不排序）
+
+    extra: 其他影响分类结果的参数，例如匹配引擎
+    """
+    payload = json.dumps([categories, *extra], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ClassificationCache:
+    """基于SQLite的分类缓存，规则变化时自动清空"""
+
+    # SQLite 单条语句的参数数量上限为 999
+    BATCH_SIZE = 900
+
+    def __init__(self, path, version, include_folders=False):
+        # sqlite3 只在真正使用缓存时导入，不拖慢只计算规则版本号的调用
+        import sqlite3
+
+        self.path = path
+        self.version = version
+        self.include_folders = include_folders
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS classified '
+            '(key BLOB PRIMARY KEY, category TEXT NOT NULL)')
+
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'rules_version'").fetchone()
+        if row is None or row[0] != version:
+            # 规则已变化，旧的分类结果全部作废
+            self.conn.execute('DELETE FROM classified')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_version', ?)",
+                (version,))
+            self.conn.commit()
+
+    def make_key(self, bookmark):
+        """书签缓存键：规则版本 + URL + 名称（文件夹评分时还有文件夹路径）的哈希"""
+        raw = f"{self.version}\0{bookmark.url}\0{bookmark.name}"
+        if self.include_folders:
+            raw += '\0' + '\0'.join(bookmark.folder_path)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, bookmarks):
+        """批量查询，返回与输入顺序一致的分类列表，未命中的位置为 None"""
+        keys = [self.make_key(b) for b in bookmarks]
+        found = {}
+        for i in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[i:i + self.BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            found.update(self.conn.execute(
+                f'SELECT key, category FROM classified WHERE key IN ({placeholders})',
+                batch))
+
+        categories = [found.get(key) for key in keys]
+        hits = len(categories) - categories.count(None)
+        self.hits += hits
+        self.misses += len(categories) - hits
+        return categories
+
+    def put_many(self, bookmarks, categories):
+        """批量写入分类结果"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO classified (key, category) VALUES (?, ?)',
+            ((self.make_key(b), c) for b, c in zip(bookmarks, categories)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
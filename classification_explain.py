@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分类解释
+解释模式下，分类循环把每个书签命中的关键词和平分决策记录到紧凑的数组旁表中，
+各分类得分按需由命中关键词重新计算（与分类时完全一致），不逐个保存得分字典；
+同时累计每个关键词在整个导出文件中的命中次数，用于找出最常命中和从未命中的关键词。
+未开启解释模式时分类循环不经过这里，没有任何额外开销。
+"""
+
+import csv
+from array import array
+
+
+class ClassificationExplanation:
+    """分类解释旁表
+
+    hit_offsets / hit_ids: 第 i 个书签命中的模式id为 hit_ids[hit_offsets[i]:hit_offsets[i+1]]
+    winners: 胜出分类的下标（-1 表示 Other），decisions: 决策类型（见 DECISIONS）
+    keyword_hits: 每个关键词命中的书签数，keyword_wins: 其中关键词属于胜出分类的书签数
+    每个书签只占 3 字节加每个命中关键词 4 字节。
+    folder_scores: 开启文件夹评分时的 FolderScoreTrie，得分中包含文件夹先验，
+    文件夹名命中的关键词由字典树按路径给出，不逐个书签保存。
+    """
+
+    UNIQUE, PRIORITY, ORDER, NO_MATCH = range(4)
+    DECISIONS = ('最高分', '平分-优先级', '平分-分类顺序', '无命中')
+
+    def __init__(self, table, priorities=None, folder_scores=None):
+        self.table = table
+        self.folder_scores = folder_scores
+        priorities = priorities or {}
+        self.priorities = [priorities.get(c, 0) for c in table.categories]
+        self.hit_offsets = array('I', [0])
+        self.hit_ids = array('I')
+        self.winners = array('h')
+        self.decisions = array('b')
+        self.keyword_hits = array('I', [0]) * len(table.keywords)
+        self.keyword_wins = array('I', [0]) * len(table.keywords)
+
+    def record(self, hits, scores, default='Other'):
+        """记录一个书签的命中关键词和得分，返回胜出的分类（与 KeywordTable.pick_best 相同）"""
+        table = self.table
+        best = max(scores, default=0)
+        if best <= 0:
+            winner, decision = -1, self.NO_MATCH
+        else:
+            tied = [i for i, score in enumerate(scores) if score == best]
+            if len(tied) == 1:
+                winner, decision = tied[0], self.UNIQUE
+            elif table.rank is None:
+                winner, decision = tied[0], self.ORDER
+            else:
+                winner = next(i for i in table.rank if scores[i] == best)
+                others = max(self.priorities[i] for i in tied if i != winner)
+                decision = self.PRIORITY if self.priorities[winner] > others else self.ORDER
+
+        keyword_hits, keyword_wins = self.keyword_hits, self.keyword_wins
+        keyword_categories = table.keyword_categories
+        for pid in hits:
+            keyword_hits[pid] += 1
+            if winner in keyword_categories[pid]:
+                keyword_wins[pid] += 1
+        self.hit_ids.extend(sorted(hits))
+        self.hit_offsets.append(len(self.hit_ids))
+        self.winners.append(winner)
+        self.decisions.append(decision)
+        return default if winner < 0 else table.categories[winner]
+
+    def __len__(self):
+        return len(self.winners)
+
+    def hits(self, index):
+        return self.hit_ids[self.hit_offsets[index]:self.hit_offsets[index + 1]]
+
+    def matched_keywords(self, index):
+        keywords = self.table.keywords
+        return [keywords[pid] for pid in self.hits(index)]
+
+    def scores(self, index, folder_path=()):
+        """第 index 个书签的非零分类得分 {分类: 得分}（含文件夹先验），按得分从高到低排列"""
+        scores = self.table.score_hits(self.hits(index))
+        if self.folder_scores is not None:
+            prior = self.folder_scores.scores(folder_path)
+            if prior is not None:
+                scores = [score + extra for score, extra in zip(scores, prior)]
+        categories = self.table.categories
+        return dict(sorted(((categories[i], score) for i, score in enumerate(scores) if score),
+                           key=lambda item: -item[1]))
+
+    def decision(self, index):
+        return self.DECISIONS[self.decisions[index]]
+
+    def keyword_ranking(self, top=20):
+        """
+        返回 (命中最多的 [(关键词, 命中数, 决定分类数, [所属分类])],
+              从未命中的 {分类: [关键词]})
+        """
+        keywords = self.table.keywords
+        ranked = sorted(range(len(keywords)), key=lambda pid: -self.keyword_hits[pid])
+        most = [(keywords[pid], self.keyword_hits[pid], self.keyword_wins[pid], self._owners(pid))
+                for pid in ranked[:top] if self.keyword_hits[pid]]
+        never = {}
+        for pid, keyword in enumerate(keywords):
+            if not self.keyword_hits[pid]:
+                for category in self._owners(pid):
+                    never.setdefault(category, []).append(keyword)
+        return most, never
+
+    def _owners(self, pid):
+        """关键词所属的分类名称（去重）"""
+        categories = self.table.categories
+        return list(dict.fromkeys(categories[i] for i in self.table.keyword_categories[pid]))
+
+    def write_tsv(self, path, bookmarks, encoding='utf-8'):
+        """
+        逐个书签写出解释表（制表符分隔，可用 Excel 打开）:
+            url, 名称, 分类, 决策, 得分（分类=得分;...）, 命中关键词[, 文件夹命中的关键词]
+        """
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f, dialect='excel-tab')
+            header = ('url', 'name', 'category', 'decision', 'scores', 'keywords')
+            writer.writerow(header if self.folder_scores is None else header + ('folder_keywords',))
+            categories = self.table.categories
+            keywords = self.table.keywords
+            for index, bookmark in enumerate(bookmarks):
+                winner = self.winners[index]
+                row = (
+                    bookmark.url, bookmark.name,
+                    'Other' if winner < 0 else categories[winner],
+                    self.decision(index),
+                    ';'.join(f'{name}={score:g}'
+                             for name, score in self.scores(index, bookmark.folder_path).items()),
+                    ','.join(self.matched_keywords(index)),
+                )
+                if self.folder_scores is not None:
+                    row += (','.join(keywords[pid] for pid in sorted(
+                        self.folder_scores.hits(bookmark.folder_path))),)
+                writer.writerow(row)
+
+    def print_report(self, top=20):
+        """打印关键词命中排行、从未命中的关键词和平分决策统计"""
+        most, never = self.keyword_ranking(top)
+        print(f"关键词命中排行（前 {top} 个）:")
+        print("-" * 60)
+        for keyword, hits, wins, owners in most:
+            print(f"  {keyword:20s} {hits:7d} 次  决定分类 {wins:7d} 次  ({', '.join(owners)})")
+        print("-" * 60)
+
+        never_count = sum(len(keywords) for keywords in never.values())
+        print(f"从未命中的关键词: {never_count} 个")
+        for category, keywords in never.items():
+            print(f"  {category}: {', '.join(keywords)}")
+
+        counts = [0] * len(self.DECISIONS)
+        for decision in self.decisions:
+            counts[decision] += 1
+        print("分类决策: " + '，'.join(f"{label} {count} 个" for label, count in zip(self.DECISIONS, counts)))
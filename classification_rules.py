@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外部分类规则
+从 YAML / JSON 文件加载分类关键词、关键词权重、分类优先级和索引页图标，
+解析结果（JSON）和编译好的匹配器（pickle）按规则文件内容的哈希缓存到磁盘，规则未改动时直接加载。
+pickle 加载时可以执行任意代码，缓存只在当前用户私有的目录中读写（见 private_cache_dir），
+读取失败一律当作未命中
+"""
+
+import json
+import os
+
+from keyword_matcher import KeywordAutomaton, TokenMatcher
+
+def _load_yaml():
+    """按需导入 PyYAML（导入较慢，只在读写 YAML 规则文件时需要）；未安装时只支持 JSON 规则文件"""
+    try:
+        import yaml
+    except ImportError:
+        return None
+    return yaml
+
+
+# 编译结果的格式版本，匹配器结构变化时递增以淘汰旧缓存
+COMPILED_FORMAT = 1
+
+
+class RulesError(ValueError):
+    """规则文件格式错误"""
+
+
+class RuleSet:
+    """分类规则
+
+    categories: {分类名称: [关键词列表]}，顺序即平分时的默认优先顺序
+    weights: {分类名称: {关键词: 权重}}，未列出的关键词记1分
+    priorities: {分类名称: 优先级}，平分时优先级高者胜出，默认 0
+    icons: {分类名称: 图标}，覆盖索引页的内置图标（可包含 'Other'）
+    digest: 规则文件内容的哈希，内置规则为 None（不做磁盘缓存）
+    """
+
+    def __init__(self, categories, weights=None, priorities=None, icons=None, digest=None):
+        self.categories = categories
+        self.weights = weights or {}
+        self.priorities = priorities or {}
+        self.icons = icons or {}
+        self.digest = digest
+        self.loaded_from_cache = False
+
+    @classmethod
+    def from_file(cls, path, cache_dir=None):
+        """
+        读取规则文件，.yaml / .yml 需要安装 PyYAML，其他扩展名按 JSON 解析
+        提供 cache_dir 时解析结果按内容哈希缓存，文件未改动时不再解析 YAML
+        """
+        import hashlib
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        cache_dir = private_cache_dir(cache_dir)
+        cache_file = cache_dir and os.path.join(cache_dir, f'rules-{digest[:32]}-v{COMPILED_FORMAT}.json')
+        if cache_file:
+            fields = _load_cached_rules(cache_file)
+            if fields is not None:
+                return cls(*fields, digest)
+
+        if path.lower().endswith(('.yaml', '.yml')):
+            yaml = _load_yaml()
+            if yaml is None:
+                raise RulesError(f"读取 YAML 规则文件需要安装 PyYAML: {path}")
+            data = yaml.safe_load(raw)
+        else:
+            data = json.loads(raw.decode('utf-8-sig'))
+        rules = cls.from_dict(data, digest)
+        if cache_file:
+            _store_cached(cache_file, [rules.categories, rules.weights, rules.priorities, rules.icons],
+                          binary=False)
+        return rules
+
+    @classmethod
+    def from_dict(cls, data, digest=None):
+        """
+        由规则数据构建，格式:
+            {"categories": {"AI/ML": {"icon": "🤖", "priority": 1,
+                                      "keywords": ["openai", {"ai": 0.5}]},
+                            "Python": ["python", "pypi"]},
+             "icons": {"Other": "📂"}}
+        关键词为字符串（1分）或 {关键词: 权重}；分类也可以直接写成关键词列表
+        """
+        if not isinstance(data, dict) or not isinstance(data.get('categories'), dict):
+            raise RulesError("规则文件缺少 categories 映射")
+
+        categories, weights, priorities = {}, {}, {}
+        icons = dict(data.get('icons') or {})
+        for name, spec in data['categories'].items():
+            if isinstance(spec, list):
+                spec = {'keywords': spec}
+            if not isinstance(spec, dict) or not isinstance(spec.get('keywords'), list):
+                raise RulesError(f"分类 {name!r} 缺少 keywords 列表")
+
+            keywords = categories[name] = []
+            for entry in spec['keywords']:
+                if isinstance(entry, str):
+                    keywords.append(entry)
+                elif isinstance(entry, dict) and len(entry) == 1:
+                    (keyword, weight), = entry.items()
+                    if not isinstance(weight, (int, float)) or isinstance(weight, bool):
+                        raise RulesError(f"分类 {name!r} 中关键词 {keyword!r} 的权重不是数字")
+                    keywords.append(keyword)
+                    weights.setdefault(name, {})[keyword] = weight
+                else:
+                    raise RulesError(f"分类 {name!r} 中无法识别的关键词: {entry!r}")
+
+            priority = spec.get('priority')
+            if priority is not None and (not isinstance(priority, (int, float)) or isinstance(priority, bool)):
+                raise RulesError(f"分类 {name!r} 的优先级不是数字: {priority!r}")
+            if priority:
+                priorities[name] = priority
+            if spec.get('icon'):
+                icons[name] = spec['icon']
+        return cls(categories, weights, priorities, icons, digest)
+
+    def to_dict(self):
+        """转换为 from_dict 接受的结构，可用于导出内置规则"""
+        categories = {}
+        for name, keywords in self.categories.items():
+            category_weights = self.weights.get(name, {})
+            spec = {}
+            if name in self.icons:
+                spec['icon'] = self.icons[name]
+            if self.priorities.get(name):
+                spec['priority'] = self.priorities[name]
+            spec['keywords'] = [{k: category_weights[k]} if k in category_weights else k
+                                for k in keywords]
+            categories[name] = spec
+        extra_icons = {k: v for k, v in self.icons.items() if k not in self.categories}
+        data = {'categories': categories}
+        if extra_icons:
+            data['icons'] = extra_icons
+        return data
+
+    def write(self, path):
+        """写出规则文件（按扩展名选择 YAML 或 JSON）"""
+        data = self.to_dict()
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.lower().endswith(('.yaml', '.yml')):
+                yaml = _load_yaml()
+                if yaml is None:
+                    raise RulesError(f"写出 YAML 规则文件需要安装 PyYAML: {path}")
+                yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def version_payload(self):
+        """影响分类结果的规则内容（用于分类缓存的版本号）"""
+        return [self.categories, self.weights, self.priorities]
+
+    def build(self, engine):
+        """编译匹配器，返回 (子串自动机, 按词匹配器或 None)"""
+        args = (self.categories, self.weights, self.priorities)
+        return KeywordAutomaton(*args), (TokenMatcher(*args) if engine == 'token' else None)
+
+    def compile(self, engine, cache_dir=None):
+        """
+        返回编译好的匹配器；来自规则文件时按 (内容哈希, 引擎, 格式版本) 缓存到 cache_dir，
+        缓存文件损坏或不存在时重新编译并写入
+        """
+        cache_dir = private_cache_dir(cache_dir)
+        if self.digest is None or not cache_dir:
+            return self.build(engine)
+
+        cache_file = os.path.join(cache_dir, f'rules-{self.digest[:32]}-{engine}-v{COMPILED_FORMAT}.pickle')
+        compiled = _load_cached(cache_file)
+        if compiled is not None:
+            self.loaded_from_cache = True
+            return compiled
+
+        compiled = self.build(engine)
+        _store_cached(cache_file, compiled)
+        return compiled
+
+
+def private_cache_dir(cache_dir):
+    """
+    创建并检查缓存目录，只有当前用户可写时才返回该目录，否则返回 None（不使用磁盘缓存）
+    POSIX 上要求目录属于当前用户且组和其他用户不可写；Windows 上依赖用户目录自身的权限
+    """
+    if not cache_dir:
+        return None
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        if os.name == 'posix':
+            st = os.stat(cache_dir)
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                return None
+    except OSError:
+        return None
+    return cache_dir
+
+
+def _load_cached(cache_file):
+    """读取编译结果缓存，不存在、已损坏或来自不兼容的版本时返回 None"""
+    import pickle
+
+    try:
+        with open(cache_file, 'rb') as f:
+            compiled = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(compiled, tuple) or len(compiled) != 2:
+        return None
+    return compiled
+
+
+def _load_cached_rules(cache_file):
+    """读取解析结果缓存 [categories, weights, priorities, icons]，任何读取失败都返回 None"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            fields = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(fields, list) or len(fields) != 4 or not all(isinstance(x, dict) for x in fields):
+        return None
+    return fields
+
+
+def _store_cached(cache_file, value, binary=True):
+    """
+    先写临时文件再原子替换，并发运行时不会读到写了一半的缓存
+    binary 为真时用 pickle 保存，否则保存为 JSON；写入失败时只是不缓存
+    """
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        if binary:
+            import pickle
+
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件夹路径评分
+用户自己起的文件夹名往往是最可靠的分类线索。按路径前缀建立字典树，每个节点保存
+从根到该文件夹的全部文件夹名命中的关键词及其分类得分；每个不同的文件夹只匹配一次，
+同一文件夹下成千上万个书签直接复用节点上的得分。
+"""
+
+
+class FolderScoreTrie:
+    """文件夹路径 -> 分类先验得分 的字典树缓存
+
+    find(text): 返回小写文本命中的模式id集合（与URL/名称使用同一套关键词表）
+    table: KeywordTable，用于把命中的关键词换算为各分类得分
+    weight: 先验得分的权重，与URL和名称的得分相加
+    路径上的关键词取并集后只计一次分，同一关键词出现在多级文件夹中不会重复加分。
+    """
+
+    def __init__(self, find, table, weight):
+        self.find = find
+        self.table = table
+        self.weight = weight
+        # 节点: [命中的模式id集合, 先验得分（无命中时为 None）, {子文件夹名: 节点}]
+        self._root = [frozenset(), None, {}]
+        self.nodes = 1
+        # 相邻书签通常位于同一文件夹（驻留后是同一个元组对象），直接返回上次的结果
+        self._last_path = ()
+        self._last_scores = None
+
+    def scores(self, folder_path):
+        """返回路径的先验得分列表（按分类下标排列），路径上没有命中任何关键词时返回 None"""
+        if folder_path is self._last_path:
+            return self._last_scores
+        node = self._root
+        for folder in folder_path:
+            child = node[2].get(folder)
+            if child is None:
+                child = node[2][folder] = self._extend(node, folder)
+            node = child
+        self._last_path, self._last_scores = folder_path, node[1]
+        return node[1]
+
+    def _extend(self, parent, folder):
+        """新文件夹节点：在父节点的命中集合上加入本级文件夹名的命中，重新计分"""
+        self.nodes += 1
+        hits = self.find(folder.lower())
+        if not hits or hits <= parent[0]:
+            return [parent[0], parent[1], {}]
+        hits = parent[0] | hits
+        weight = self.weight
+        return [frozenset(hits), [weight * score for score in self.table.score_hits(hits)], {}]
+
+    def hits(self, folder_path):
+        """路径上命中的模式id集合（解释模式使用）"""
+        self.scores(folder_path)
+        node = self._root
+        for folder in folder_path:
+            node = node[2][folder]
+        return node[0]
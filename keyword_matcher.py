@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词多模式匹配器
+- KeywordAutomaton: 将分类关键词表编译为 Aho-Corasick 自动机，按子串匹配
+- TokenMatcher: 按词边界切分URL和名称，通过倒排索引查找关键词
+两者共用同一套关键词编号，得分和平分规则完全一致
+"""
+
+import re
+from collections import deque
+
+
+class KeywordTable:
+    """关键词表：关键词去重编号，并记录每个关键词所属的分类
+
+    categories: {分类名称: [关键词列表]}，分类顺序即平分时的优先顺序
+    weights: 可选 {分类名称: {关键词: 权重}}，未列出的关键词记1分
+    priorities: 可选 {分类名称: 优先级}，平分时优先级高者胜出，相同时取分类表中靠前者
+    """
+
+    def __init__(self, categories, weights=None, priorities=None):
+        self.categories = list(categories)
+        self.keywords = []              # 模式id -> 小写关键词
+        self.keyword_categories = []    # 模式id -> 分类下标元组（保留重复，与逐个计分一致）
+        self.keyword_weights = None     # 模式id -> ((分类下标, 权重), ...)，无自定义权重时为 None
+
+        weights = {category: {k.lower(): w for k, w in table.items()}
+                   for category, table in (weights or {}).items() if table}
+        pattern_ids = {}
+        keyword_categories = []
+        keyword_weights = []
+        for category_index, (category, keywords) in enumerate(categories.items()):
+            category_weights = weights.get(category, {})
+            for keyword in keywords:
+                keyword = keyword.lower()
+                pid = pattern_ids.get(keyword)
+                if pid is None:
+                    pid = pattern_ids[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    keyword_categories.append([])
+                    keyword_weights.append([])
+                keyword_categories[pid].append(category_index)
+                keyword_weights[pid].append((category_index, category_weights.get(keyword, 1)))
+        self.keyword_categories = [tuple(c) for c in keyword_categories]
+        if weights:
+            self.keyword_weights = [tuple(w) for w in keyword_weights]
+
+        # 平分时的分类下标顺序；没有自定义优先级时为 None，直接按分类表顺序
+        self.rank = None
+        priorities = priorities or {}
+        if any(priorities.get(c, 0) for c in self.categories):
+            self.rank = sorted(range(len(self.categories)),
+                               key=lambda i: -priorities.get(self.categories[i], 0))
+
+    def score_hits(self, hits):
+        """根据命中的模式id集合计算各分类得分"""
+        scores = [0] * len(self.categories)
+        if self.keyword_weights is not None:
+            keyword_weights = self.keyword_weights
+            for pid in hits:
+                for category_index, weight in keyword_weights[pid]:
+                    scores[category_index] += weight
+            return scores
+
+        keyword_categories = self.keyword_categories
+        for pid in hits:
+            for category_index in keyword_categories[pid]:
+                scores[category_index] += 1
+        return scores
+
+    def ranked_categories(self):
+        """按平分优先顺序排列的分类名称"""
+        if self.rank is None:
+            return list(self.categories)
+        return [self.categories[i] for i in self.rank]
+
+    def weight_matrix(self, np):
+        """
+        关键词 -> 分类 的权重矩阵 (关键词数 x 分类数)，重复出现的关键词按次数计分
+        列按 ranked_categories() 的顺序排列，按行 argmax 即可得到与 pick_best 一致的平分结果
+        """
+        columns = self.rank or range(len(self.categories))
+        column_of = {category_index: col for col, category_index in enumerate(columns)}
+        weights = np.zeros((len(self.keywords), len(self.categories)))
+        keyword_weights = self.keyword_weights or [
+            tuple((category_index, 1) for category_index in c) for c in self.keyword_categories]
+        for pid, pairs in enumerate(keyword_weights):
+            for category_index, weight in pairs:
+                weights[pid, column_of[category_index]] += weight
+        return weights
+
+    def pick_best(self, scores, default='Other'):
+        """返回得分最高的分类；平分时取优先级高者，再取分类表中靠前者（与 max() 行为一致）"""
+        best = max(scores)
+        if best <= 0:
+            return default
+        if self.rank is None:
+            return self.categories[scores.index(best)]
+        for category_index in self.rank:
+            if scores[category_index] == best:
+                return self.categories[category_index]
+
+    def contains_any(self, chars):
+        """是否有关键词包含给定字符之一"""
+        return any(ch in keyword for keyword in self.keywords for ch in chars)
+
+
+class KeywordAutomaton(KeywordTable):
+    """Aho-Corasick 关键词自动机（子串匹配）"""
+
+    def __init__(self, categories, weights=None, priorities=None):
+        super().__init__(categories, weights, priorities)
+        self._build()
+
+    def _build(self):
+        """构建 goto / fail 表，并展开为确定性转移表"""
+        goto = [{}]
+        output = [[]]
+
+        for pid, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pid)
+
+        # 按广度优先计算失败指针，同时把失败状态的转移和输出合并进来
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque()
+        for child in goto[0].values():
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                transitions[ch] = child
+                queue.append(child)
+            delta[state] = transitions
+            output[state] = output[state] + output[fail[state]]
+
+        self._delta = delta
+        self._output = [tuple(o) for o in output]
+
+    def find(self, text, hits=None):
+        """单次扫描文本，返回命中的模式id集合（可传入已有集合继续累加）"""
+        delta = self._delta
+        output = self._output
+        hits = set() if hits is None else hits
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                hits.update(output[state])
+        return hits
+
+    def iter_hits(self, text):
+        """遍历所有命中的 (分类, 关键词) 对"""
+        for pid in sorted(self.find(text)):
+            keyword = self.keywords[pid]
+            for category_index in self.keyword_categories[pid]:
+                yield self.categories[category_index], keyword
+
+    def score(self, text):
+        """返回按分类下标排列的得分列表（每个命中的关键词按其权重计分，默认1分）"""
+        return self.score_hits(self.find(text))
+
+    def best_category(self, text, default='Other'):
+        """返回文本得分最高的分类"""
+        return self.pick_best(self.score(text), default)
+
+
+# 英文/数字词（保留 c++ 这类结尾的 ++），以及连续的中日韩字符
+_WORD_RE = re.compile(r'[a-z0-9]+(?:\+\+)?|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+')
+
+
+# 去掉协议后将 URL 拆为 主机 / 路径 / 查询 / 锚点 四段
+_URL_FIELDS_RE = re.compile(r'(?:[a-z][a-z0-9+.-]*://)?([^/?#]*)([^?#]*)(?:\?([^#]*))?(?:#(.*))?', re.S)
+
+
+def _is_cjk(token):
+    return token[0] > '\u3000'
+
+
+class TokenMatcher(KeywordTable):
+    """按词边界匹配的关键词引擎
+
+    URL 拆分为主机、路径、查询三段分别切词，名称中的中日韩文本按关键词词典
+    做正向最大匹配分词。单词关键词通过倒排索引 (词 -> 模式id) 查找，
+    多词关键词（如 'machine learning'、'node.js'）在同一段内按相邻词序列匹配。
+    'ai' 不再命中 'mail'，'ux' 不再命中 'linux'。
+    """
+
+    def __init__(self, categories, weights=None, priorities=None):
+        super().__init__(categories, weights, priorities)
+        self._index = {}        # 词 -> (单词关键词的模式id元组, [(多词关键词其余词元组, 模式id)])
+        self._cjk_words = set()
+
+        # 先收集中日韩词典，关键词本身切词时整段作为一个词
+        tokenized = [_WORD_RE.findall(keyword) for keyword in self.keywords]
+        for tokens in tokenized:
+            self._cjk_words.update(t for t in tokens if _is_cjk(t))
+        self._cjk_max = max((len(w) for w in self._cjk_words), default=0)
+
+        singles, phrases = {}, {}
+        for pid, tokens in enumerate(tokenized):
+            if len(tokens) == 1:
+                singles.setdefault(tokens[0], []).append(pid)
+            elif tokens:
+                phrases.setdefault(tokens[0], []).append((tuple(tokens[1:]), pid))
+        self._index = {
+            token: (tuple(singles.get(token, ())), phrases.get(token))
+            for token in set(singles) | set(phrases)
+        }
+
+    def segment(self, run):
+        """中日韩文本正向最大匹配分词，词典外的字符单独成词"""
+        words = self._cjk_words
+        tokens = []
+        i, n = 0, len(run)
+        while i < n:
+            for size in range(min(self._cjk_max, n - i), 0, -1):
+                if run[i:i + size] in words:
+                    break
+            else:
+                size = 1
+            tokens.append(run[i:i + size])
+            i += size
+        return tokens
+
+    def tokenize(self, text):
+        """将一段小写文本切成词序列"""
+        tokens = []
+        for token in _WORD_RE.findall(text):
+            if _is_cjk(token):
+                tokens.extend(self.segment(token))
+            else:
+                tokens.append(token)
+        return tokens
+
+    def find_tokens(self, tokens, hits):
+        """在一个词序列中查找单词和多词关键词，结果累加到 hits"""
+        index = self._index
+        for i, token in enumerate(tokens):
+            entry = index.get(token)
+            if entry is None:
+                continue
+            pids, phrases = entry
+            hits.update(pids)
+            if phrases:
+                for rest, pid in phrases:
+                    if tuple(tokens[i + 1:i + 1 + len(rest)]) == rest:
+                        hits.add(pid)
+        return hits
+
+    def find_bookmark(self, url_lower, name_lower):
+        """返回书签命中的模式id集合（URL 各段与名称分别匹配，多词关键词不跨段）"""
+        hits = set()
+        for field in _URL_FIELDS_RE.match(url_lower).groups():
+            if field:
+                self.find_tokens(self.tokenize(field), hits)
+        self.find_tokens(self.tokenize(name_lower), hits)
+        return hits
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出文件清单
+记录输出目录中每个文件的内容哈希，内容完全相同的文件不再重写，
+避免同步工具因修改时间变化而反复上传；
+另外每次运行都记录生成的文件列表，下次运行时删除不再生成的旧文件
+"""
+
+import hashlib
+import json
+import os
+
+
+class HashingWriter:
+    """只计算哈希、不落盘的文本写入对象（按输出编码计算）"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self._hash = hashlib.sha256()
+
+    def write(self, text):
+        self._hash.update(text.encode(self.encoding))
+        return len(text)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+class OutputManifest:
+    """输出目录下的 {文件名: 内容哈希} 清单
+
+    文件存在、哈希相同且修改时间与清单记录一致时视为未变化；
+    文件被外部修改或删除后会重新写入。
+    """
+
+    FILENAME = '.manifest.json'
+
+    def __init__(self, output_dir, encoding='utf-8'):
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self.output_dir = output_dir
+        self.encoding = encoding
+        self.written = []
+        self.skipped = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+        except (OSError, ValueError, AttributeError):
+            self.files = {}
+
+    def content_digest(self, write):
+        """write(f) 将内容写入文件对象；返回这些内容的哈希，不产生任何磁盘写入"""
+        writer = HashingWriter(self.encoding)
+        write(writer)
+        return writer.hexdigest()
+
+    def is_current(self, filename, digest):
+        entry = self.files.get(filename)
+        if entry is None or entry.get('sha256') != digest:
+            return False
+        try:
+            mtime_ns = os.stat(os.path.join(self.output_dir, filename)).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return entry.get('mtime_ns') == mtime_ns
+
+    def record(self, filename, digest):
+        """文件写入（替换）完成后记录新的哈希和修改时间"""
+        mtime_ns = os.stat(os.path.join(self.output_dir, filename)).st_mtime_ns
+        self.files[filename] = {'sha256': digest, 'mtime_ns': mtime_ns}
+        self.written.append(filename)
+
+    def skip(self, filename):
+        self.skipped.append(filename)
+
+    def forget(self, filename):
+        """文件已删除，不再记录"""
+        self.files.pop(filename, None)
+
+    def save(self):
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': dict(sorted(self.files.items()))}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+OUTPUT_LIST_FILENAME = '.outputs.json'
+
+
+def remove_stale_outputs(output_dir, current, manifest=None):
+    """
+    删除上次生成、这次不再生成的文件（分类消失，或拆分的文件数变化后多出的旧分片），
+    并记录这次生成的文件列表；确定性输出时清单中记录的文件也算作上次生成的文件
+    current: 这次生成的全部文件名。返回删除的文件名列表
+    """
+    path = os.path.join(output_dir, OUTPUT_LIST_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            recorded = set(json.load(f).get('files', []))
+    except (OSError, ValueError, AttributeError, TypeError):
+        recorded = set()
+    current = set(current)
+    previous = recorded | set(manifest.files) if manifest is not None else recorded
+
+    stale = sorted(previous - current)
+    for filename in stale:
+        # 只删除输出目录下的文件，列表被改写成其他路径时忽略
+        if os.path.basename(filename) == filename:
+            try:
+                os.remove(os.path.join(output_dir, filename))
+            except FileNotFoundError:
+                pass
+        if manifest is not None:
+            manifest.forget(filename)
+    if manifest is not None and stale:
+        manifest.save()
+
+    if recorded != current:
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': sorted(current)}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    return stale
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线性能剖析
+记录每个阶段的墙钟时间、CPU时间、常驻内存（开始/结束值和阶段内峰值）和吞吐量，统计关键词/分类的匹配开销，
+结果输出到控制台和JSON报告，可选导出 cProfile 数据
+计时不开启 tracemalloc（它会让解析和分类慢数倍）；Python 堆峰值需单独用 heap=True 测量
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不记录峰值常驻内存
+    resource = None
+
+
+def peak_rss_kb():
+    """当前进程的峰值常驻内存（KB），不支持的平台返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def current_rss_kb():
+    """当前进程的常驻内存（KB），读取 /proc/self/statm，不支持的平台返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * (resource.getpagesize() if resource is not None else 4096) // 1024
+
+
+def rss_high_water_kb():
+    """常驻内存高水位 VmHWM（KB），读取 /proc/self/status，不支持的平台返回 None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_rss_high_water():
+    """
+    把 VmHWM 重置为当前常驻内存（Linux 4.0+，向 /proc/self/clear_refs 写入 5），
+    之后读到的 rss_high_water_kb() 即为重置以来的峰值；不支持时返回 False
+    注意重置后 ru_maxrss 也随之降低，进程整体的峰值需要调用方自己保留
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class StagePeak:
+    """按阶段测量常驻内存峰值：每个阶段开始时重置 VmHWM，结束时读取
+
+    同时保留进程整体的峰值（重置会让 ru_maxrss 一起降低，不能再直接使用）。
+    不支持重置的平台上 stage_peak 为 None，process_peak 退回 ru_maxrss
+    """
+
+    def __init__(self):
+        self.process_peak_kb = None
+        self._resettable = None
+
+    def _update_process_peak(self, value):
+        if value is not None:
+            self.process_peak_kb = max(self.process_peak_kb or 0, value)
+
+    def begin(self):
+        self._update_process_peak(rss_high_water_kb())
+        self._resettable = reset_rss_high_water()
+
+    def end(self, rss_end=None):
+        """
+        返回 (本阶段的峰值, 进程到目前为止的峰值)，单位 KB
+        内核按批同步内存计数，VmHWM 可能略低于刚读到的当前值 rss_end，取两者的较大值
+        """
+        if not self._resettable:
+            return None, peak_rss_kb()
+        stage_peak = max(rss_high_water_kb() or 0, rss_end or 0) or None
+        self._update_process_peak(stage_peak)
+        return stage_peak, self.process_peak_kb
+
+
+class PipelineProfiler:
+    """按阶段记录性能数据；未启用时 stage() 不做任何测量
+
+    heap=True 时用 tracemalloc 记录每个阶段的 Python 堆峰值，此时计时包含跟踪开销，
+    报告中会标明，不宜与未开启时的计时对比
+    """
+
+    def __init__(self, enabled=False, cprofile_path=None, heap=False):
+        self.enabled = enabled
+        self.cprofile_path = cprofile_path
+        self.heap = enabled and heap
+        self.stages = []
+        self.keyword_costs = []
+        self.category_costs = []
+        self.keyword_sample = 0
+        self.engine_cost = None
+        self._cprofile = None
+        self._peak = StagePeak()
+
+    def start(self):
+        if not self.enabled:
+            return
+        if self.heap:
+            tracemalloc.start()
+        if self.cprofile_path:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if not self.enabled:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+        if self.heap:
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        测量一个阶段；with 块内可通过返回的字典设置 items（处理的书签数）
+        """
+        record = {'stage': name, 'items': None}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.heap:
+            tracemalloc.reset_peak()
+        self._peak.begin()
+        rss_start = current_rss_kb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            items = record['items']
+            rss_end = current_rss_kb()
+            stage_peak, process_peak = self._peak.end(rss_end)
+            record.update({
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(cpu, 4),
+                'items_per_sec': round(items / wall) if items and wall else None,
+                # 阶段开始和结束时的常驻内存、本阶段内的峰值（只在 Linux 上可用）
+                # 以及进程到此为止的峰值
+                'rss_start_kb': rss_start,
+                'rss_end_kb': rss_end,
+                'peak_rss_kb': stage_peak,
+                'max_rss_kb': process_peak,
+                'peak_python_kb': tracemalloc.get_traced_memory()[1] // 1024 if self.heap else None,
+            })
+            self.stages.append(record)
+
+    def measure_engine(self, engine, classify, sample):
+        """在样本书签上测量实际使用的匹配引擎的分类耗时"""
+        if not self.enabled or not sample:
+            return
+        start = time.perf_counter()
+        for bookmark in sample:
+            classify(bookmark)
+        elapsed = time.perf_counter() - start
+        self.engine_cost = {'engine': engine, 'seconds': round(elapsed, 6), 'sample': len(sample)}
+
+    def measure_keywords(self, categories, texts):
+        """
+        估算每个关键词的开销：在样本文本上逐个做子串匹配（keyword in text），并按分类汇总
+        实际分类用自动机或分词引擎一次扫描全部关键词，这里的数字只用于比较关键词之间的相对代价
+        texts: 已组合好的小写搜索文本样本
+        """
+        if not self.enabled:
+            return
+        category_costs = {}
+        measured = {}
+        for category, keywords in categories.items():
+            total = 0.0
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword not in measured:
+                    start = time.perf_counter()
+                    hits = sum(1 for text in texts if keyword in text)
+                    measured[keyword] = (time.perf_counter() - start, hits)
+                total += measured[keyword][0]
+            category_costs[category] = total
+
+        self.keyword_costs = sorted(
+            ({'keyword': k, 'seconds': round(cost, 6), 'hits': hits}
+             for k, (cost, hits) in measured.items()),
+            key=lambda x: x['seconds'], reverse=True)
+        self.category_costs = sorted(
+            ({'category': c, 'seconds': round(cost, 6)} for c, cost in category_costs.items()),
+            key=lambda x: x['seconds'], reverse=True)
+        self.keyword_sample = len(texts)
+
+    def print_report(self, top=10):
+        """在控制台输出剖析结果"""
+        if not self.enabled:
+            return
+        print("性能剖析:" + ("（已开启 tracemalloc，计时包含跟踪开销）" if self.heap else ""))
+        print("-" * 60)
+        for s in self.stages:
+            rate = f"{s['items_per_sec']:>9d} 个/秒" if s['items_per_sec'] else ' ' * 13
+            rss_text = ''
+            if s['rss_end_kb'] is not None:
+                rss_text = f"  RSS 开始/结束 {s['rss_start_kb'] / 1024:.1f} / {s['rss_end_kb'] / 1024:.1f} MB"
+            if s['peak_rss_kb'] is not None:
+                rss_text += f"  阶段峰值 {s['peak_rss_kb'] / 1024:.1f} MB"
+            elif s['max_rss_kb'] is not None:
+                rss_text += f"  进程最高RSS {s['max_rss_kb'] / 1024:.1f} MB"
+            heap_text = ''
+            if s['peak_python_kb'] is not None:
+                heap_text = f"  堆峰值 {s['peak_python_kb'] / 1024:.1f} MB"
+            print(f"  {s['stage']:9s}: 墙钟 {s['wall_seconds']:7.3f} s  CPU {s['cpu_seconds']:7.3f} s"
+                  f"  {rate}{rss_text}{heap_text}")
+        if self.engine_cost:
+            e = self.engine_cost
+            print(f"  {e['engine']} 引擎分类样本 {e['sample']} 个书签: {e['seconds'] * 1000:.2f} ms")
+        if self.keyword_costs:
+            print(f"  子串匹配估算的关键词开销（样本 {self.keyword_sample} 个书签，逐个 keyword in text，"
+                  f"非实际引擎）:")
+            for k in self.keyword_costs[:top]:
+                print(f"    {k['keyword']:24s} {k['seconds'] * 1000:8.2f} ms  命中 {k['hits']}")
+            print("  子串匹配估算的分类开销:")
+            for c in self.category_costs[:top]:
+                print(f"    {c['category']:24s} {c['seconds'] * 1000:8.2f} ms")
+        if self.cprofile_path:
+            print(f"  cProfile 数据: {self.cprofile_path}")
+        print("-" * 60)
+
+    def write_report(self, path, **extra):
+        """写出JSON报告"""
+        if not self.enabled:
+            return
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            **extra,
+            'heap_traced': self.heap,
+            'stages': self.stages,
+            'engine': self.engine_cost,
+            'keyword_estimate': 'substring',
+            'keywords': self.keyword_costs,
+            'categories': self.category_costs,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
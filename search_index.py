@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+index.html 的客户端搜索索引
+每个分类生成一个紧凑的索引分片（<分类>.search.js），主机名单独成表，
+书签记录打包为以制表符/换行分隔的单个字符串。index.html 在搜索框第一次获得焦点时
+才用 <script> 加载各分片（file:// 打开时也可用），之后在浏览器内即时过滤
+"""
+
+import json
+import re
+
+# 拆出 URL 的 协议+主机 部分，同一主机的书签共享主机表中的一项
+_ORIGIN_RE = re.compile(r'([a-z][a-z0-9+.-]*://[^/?#]*)(.*)', re.I | re.S)
+
+# 索引字符串中的字段和记录分隔符，需从名称和URL中去除
+_SEPARATORS = str.maketrans('\t\n\r', '   ')
+
+
+def shard_filename(category_filename):
+    """分类文件名对应的索引分片文件名，如 python.html -> python.search.js"""
+    return category_filename[:-len('.html')] + '.search.js'
+
+
+def write_search_shard(category_name, pages, per_page, bookmarks, f):
+    """
+    一次遍历书签，写出一个索引分片:
+        bookmarkSearch.add(分类, [分类文件], 每个文件的书签数, [主机表], "主机序号\\t路径\\t名称\\n...")
+    pages 为分类的各个输出文件（大分类会拆分为多个），第 i 条书签位于 pages[i // per_page]
+    """
+    hosts = {}
+    records = []
+    for bookmark in bookmarks:
+        url, name = bookmark.url, bookmark.name
+        # 分隔符极少出现，先用 in 检查，避免对每条记录调用较慢的 translate
+        if '\t' in url or '\n' in url or '\r' in url:
+            url = url.translate(_SEPARATORS)
+        if '\t' in name or '\n' in name or '\r' in name:
+            name = name.translate(_SEPARATORS)
+        match = _ORIGIN_RE.fullmatch(url)
+        origin, rest = match.groups() if match else ('', url)
+        host_index = hosts.setdefault(origin, len(hosts))
+        records.append(f'{host_index}\t{rest}\t{name}')
+
+    f.write('bookmarkSearch.add(')
+    f.write(json.dumps(category_name, ensure_ascii=False))
+    f.write(',')
+    f.write(json.dumps(list(pages)))
+    f.write(f',{per_page},')
+    f.write(json.dumps(list(hosts), ensure_ascii=False, separators=(',', ':')))
+    f.write(',')
+    f.write(json.dumps('\n'.join(records), ensure_ascii=False))
+    f.write(');\n')
+
+
+SEARCH_STYLE = '''
+        .search {
+            max-width: 800px;
+            margin: 0 auto 40px;
+        }
+
+        #search-box {
+            width: 100%;
+            padding: 15px 20px;
+            font-size: 1.1rem;
+            border: none;
+            border-radius: 10px;
+            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
+            outline: none;
+        }
+
+        #search-status {
+            color: rgba(255,255,255,0.9);
+            margin: 10px 5px;
+            min-height: 1.2em;
+        }
+
+        #search-results {
+            list-style: none;
+            background: white;
+            border-radius: 10px;
+            overflow: hidden;
+        }
+
+        #search-results:empty {
+            display: none;
+        }
+
+        #search-results li {
+            padding: 10px 20px;
+            border-bottom: 1px solid #eee;
+        }
+
+        #search-results a {
+            color: #333;
+            text-decoration: none;
+            font-weight: bold;
+        }
+
+        #search-results .result-meta a {
+            color: #667eea;
+            font-weight: normal;
+        }
+
+        #search-results .result-meta {
+            color: #999;
+            font-size: 0.85rem;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            white-space: nowrap;
+        }
+'''
+
+SEARCH_BOX = '''
+        <div class="search">
+            <input id="search-box" type="search" placeholder="搜索书签（名称或网址，多个词用空格分隔）" autocomplete="off">
+            <div id="search-status"></div>
+            <ul id="search-results"></ul>
+        </div>
+'''
+
+_SEARCH_SCRIPT = '''
+    <script>
+    (function () {
+        var SHARDS = %s;
+        var LIMIT = 100;
+        var box = document.getElementById('search-box');
+        var status = document.getElementById('search-status');
+        var list = document.getElementById('search-results');
+        var records = [];
+        var requested = false;
+        var pending = 0;
+
+        window.bookmarkSearch = {
+            add: function (category, pages, perPage, hosts, packed) {
+                if (packed) {
+                    var lines = packed.split('\\n');
+                    for (var i = 0; i < lines.length; i++) {
+                        var parts = lines[i].split('\\t');
+                        var url = hosts[+parts[0]] + parts[1];
+                        var page = pages[Math.min(Math.floor(i / perPage), pages.length - 1)];
+                        records.push([(parts[2] + ' ' + url).toLowerCase(), parts[2], url, category, page]);
+                    }
+                }
+                pending--;
+                run();
+            }
+        };
+
+        function load() {
+            if (requested) return;
+            requested = true;
+            pending = SHARDS.length;
+            status.textContent = '正在加载搜索索引...';
+            SHARDS.forEach(function (src) {
+                var script = document.createElement('script');
+                script.src = src;
+                script.onerror = function () { pending--; run(); };
+                document.body.appendChild(script);
+            });
+        }
+
+        function run() {
+            var terms = box.value.toLowerCase().split(/\\s+/).filter(Boolean);
+            list.textContent = '';
+            if (!terms.length) {
+                status.textContent = pending > 0 ? '正在加载搜索索引...' : '';
+                return;
+            }
+            var total = 0;
+            for (var i = 0; i < records.length; i++) {
+                var text = records[i][0];
+                var ok = true;
+                for (var j = 0; j < terms.length && ok; j++) ok = text.indexOf(terms[j]) !== -1;
+                if (!ok) continue;
+                if (++total > LIMIT) continue;
+                var r = records[i];
+                var item = document.createElement('li');
+                var link = document.createElement('a');
+                link.href = r[2];
+                link.textContent = r[1];
+                var meta = document.createElement('div');
+                meta.className = 'result-meta';
+                var category = document.createElement('a');
+                category.href = r[4];
+                category.textContent = r[3];
+                meta.appendChild(category);
+                meta.appendChild(document.createTextNode(' · ' + r[2]));
+                item.appendChild(link);
+                item.appendChild(meta);
+                list.appendChild(item);
+            }
+            status.textContent = '找到 ' + total + ' 个书签' + (total > LIMIT ? '，显示前 ' + LIMIT + ' 个' : '') +
+                (pending > 0 ? '（索引加载中）' : '');
+        }
+
+        box.addEventListener('focus', load);
+        box.addEventListener('input', function () { load(); run(); });
+    })();
+    </script>
+'''
+
+
+def search_script(shard_files):
+    """index.html 中的搜索脚本，shard_files 为各分类索引分片的相对路径"""
+    return _SEARCH_SCRIPT % json.dumps(list(shard_files), ensure_ascii=False)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出生成测试
+generate_all 替换中途出错时，已替换的文件为新内容，其余保留旧内容，输出目录中不留下临时文件。
+    python -m unittest test_output      或     python -m pytest test_output.py
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bookmark_classifier import HTMLGenerator
+from bookmark_record import Bookmark
+
+
+def make_classified(suffix=''):
+    return {
+        'Programming': [Bookmark('https://github.com/a', 'GitHub' + suffix, '1600000001')],
+        'Other': [Bookmark('https://example.org/', 'Example' + suffix, '1600000002')],
+    }
+
+
+class GenerateAllTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output_dir = self.tmp.name
+
+    def read_all(self):
+        contents = {}
+        for filename in os.listdir(self.output_dir):
+            with open(os.path.join(self.output_dir, filename), encoding='utf-8') as f:
+                contents[filename] = f.read()
+        return contents
+
+    def test_replace_failure_removes_temp_files(self):
+        HTMLGenerator.generate_all(make_classified(), self.output_dir, workers=1, search=False)
+        before = self.read_all()
+
+        real_replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError('disk full')
+            real_replace(src, dst)
+
+        with mock.patch('os.replace', failing_replace):
+            with self.assertRaises(OSError):
+                HTMLGenerator.generate_all(make_classified(' v2'), self.output_dir, workers=1, search=False)
+
+        after = self.read_all()
+        self.assertEqual(sorted(after), sorted(before))
+        replaced = os.path.basename(calls[0])
+        for filename, text in after.items():
+            if filename == replaced:
+                self.assertIn(' v2', text)
+            else:
+                self.assertEqual(text, before[filename])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析器差异测试
+快速解析器（FastBookmarkParser）与 HTMLParser 解析器（BookmarkParser）在同一份导出文件上
+必须得到完全相同的书签；快速解析器遇到无法识别的行时回退到 HTMLParser，
+并跳过回退前已经产出的书签，不重复也不遗漏。
+    python -m unittest test_parser      或     python -m pytest test_parser.py
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from bookmark_classifier import BookmarkParser, FastBookmarkParser, MalformedExportError
+
+HEADER = '''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+'''
+
+# Chrome 导出格式的书签，快速解析器可以直接逐行处理
+REGULAR = '''    <DT><H3 ADD_DATE="1600000000" LAST_MODIFIED="1600000001">Dev &amp; Tools</H3>
+    <DL><p>
+        <DT><A HREF="https://github.com/a?x=1&amp;y=2" ADD_DATE="1600000002" ICON="data:image/png;base64,AAAA">GitHub &lt;repo&gt; &#39;a&#39; &quot;b&quot;</A>
+        <DT><A HREF="https://docs.python.org/3/" ADD_DATE="1600000003">  Python 文档  </A>
+        <DT><H3 ADD_DATE="1600000004">学习资料</H3>
+        <DL><p>
+            <DT><A HREF="https://example.org/&#x4e2d;" ADD_DATE="1600000005">Caf&eacute; &amp; 中文 &#20013;</A>
+        </DL><p>
+    </DL><p>
+'''
+
+FOOTER = '''    <DT><A HREF="https://www.bilibili.com/video/1" ADD_DATE="1600000009">视频 &amp; 音乐</A>
+</DL><p>
+'''
+
+
+def bookmark_fields(bookmarks):
+    return [(b.url, b.name, b.add_date, b.folder_path, b.icon) for b in bookmarks]
+
+
+class ParserDifferentialTest(unittest.TestCase):
+    """在同一份文件上对比两个解析器的结果"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, body):
+        path = os.path.join(self.tmp.name, 'bookmarks.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(HEADER + body + FOOTER)
+        return path
+
+    def fast_fails(self, path):
+        """快速解析器逐行解析时是否会遇到无法识别的行（即 iter_file 会回退）"""
+        with open(path, encoding='utf-8') as f:
+            try:
+                for _ in FastBookmarkParser.iter_lines(f):
+                    pass
+            except MalformedExportError:
+                return True
+        return False
+
+    def assert_same(self, body, fallback):
+        """两个解析器结果相同（含图标和不同的分块大小），并确认是否走了回退路径"""
+        path = self.write(body)
+        self.assertEqual(self.fast_fails(path), fallback)
+        for keep_icons in (False, True):
+            expected = bookmark_fields(BookmarkParser.iter_file(path, keep_icons=keep_icons))
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                fast = bookmark_fields(FastBookmarkParser.iter_file(path, keep_icons=keep_icons))
+            self.assertEqual(fast, expected)
+            self.assertEqual(bool(stderr.getvalue()), fallback)
+            # 分块读取时标签和实体可能被拆开，结果必须与一次读完相同
+            small_chunks = bookmark_fields(BookmarkParser.iter_file(path, chunk_size=7, keep_icons=keep_icons))
+            self.assertEqual(small_chunks, expected)
+        return expected
+
+    def test_regular_export(self):
+        bookmarks = self.assert_same(REGULAR, fallback=False)
+        self.assertEqual(len(bookmarks), 4)
+
+    def test_entities(self):
+        bookmarks = self.assert_same(REGULAR, fallback=False)
+        url, name, _, path, _ = bookmarks[0]
+        self.assertEqual(url, 'https://github.com/a?x=1&y=2')
+        self.assertEqual(name, 'GitHub <repo> \'a\' "b"')
+        self.assertEqual(path, ('Dev & Tools',))
+        self.assertEqual(bookmarks[2][0], 'https://example.org/中')
+        self.assertEqual(bookmarks[2][1], 'Café & 中文 中')
+        self.assertEqual(bookmarks[2][3], ('Dev & Tools', '学习资料'))
+
+    def test_empty_names(self):
+        body = REGULAR + '''    <DT><A HREF="https://empty.example/" ADD_DATE="1600000006"></A>
+    <DT><A HREF="https://blank.example/" ADD_DATE="1600000007">   </A>
+'''
+        bookmarks = self.assert_same(body, fallback=False)
+        self.assertNotIn('https://empty.example/', [b[0] for b in bookmarks])
+        self.assertNotIn('https://blank.example/', [b[0] for b in bookmarks])
+
+    def test_single_quoted_attribute_mid_file(self):
+        # 回退前快速解析器已经产出 3 个书签，回退后必须跳过它们，不能重复
+        body = REGULAR + '''    <DT><A HREF='https://single.example/q' ADD_DATE='1600000006'>Single &amp; quoted</A>
+'''
+        bookmarks = self.assert_same(body, fallback=True)
+        self.assertEqual(len(bookmarks), 5)
+        self.assertEqual(bookmarks[3][:3], ('https://single.example/q', 'Single & quoted', '1600000006'))
+
+    def test_multi_line_tag(self):
+        body = REGULAR + '''    <DT><A HREF="https://multi.example/"
+        ADD_DATE="1600000006">Multi line</A>
+'''
+        bookmarks = self.assert_same(body, fallback=True)
+        self.assertEqual(bookmarks[3][:3], ('https://multi.example/', 'Multi line', '1600000006'))
+
+    def test_nested_tag_in_name(self):
+        body = REGULAR + '''    <DT><A HREF="https://nested.example/" ADD_DATE="1600000006">Nested <b>bold</b> name</A>
+'''
+        bookmarks = self.assert_same(body, fallback=True)
+        self.assertEqual(bookmarks[3][:2], ('https://nested.example/', 'Nested bold name'))
+
+
+if __name__ == '__main__':
+    unittest.main()
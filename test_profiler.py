@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+剖析器测试
+每个阶段记录开始/结束时的常驻内存和本阶段内的峰值（Linux），阶段内分配后释放的内存也计入峰值；
+--cprofile / --profile-heap 单独使用时隐含 --profile。
+    python -m unittest test_profiler      或     python -m pytest test_profiler.py
+"""
+
+import unittest
+
+from bookmark_classifier import parse_args
+from profiler import PipelineProfiler, reset_rss_high_water, rss_high_water_kb
+
+
+class StagePeakTest(unittest.TestCase):
+
+    @unittest.skipUnless(rss_high_water_kb() is not None and reset_rss_high_water(), '需要 Linux 的 VmHWM')
+    def test_peak_is_per_stage(self):
+        profiler = PipelineProfiler(enabled=True)
+        with profiler.stage('alloc'):
+            block = bytearray(64 * 1024 * 1024)
+            block[::4096] = b'\1' * len(range(0, len(block), 4096))
+            del block
+        with profiler.stage('idle'):
+            pass
+        alloc, idle = profiler.stages
+        self.assertGreaterEqual(alloc['peak_rss_kb'], alloc['rss_end_kb'] + 60 * 1024)
+        # 第二个阶段的峰值不包含上一阶段已释放的内存，进程峰值仍然保留
+        self.assertLess(idle['peak_rss_kb'], alloc['peak_rss_kb'] - 60 * 1024)
+        self.assertGreaterEqual(idle['max_rss_kb'], alloc['peak_rss_kb'])
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = PipelineProfiler()
+        with profiler.stage('parse') as stage:
+            stage['items'] = 1
+        self.assertEqual(profiler.stages, [])
+
+
+class ProfileOptionsTest(unittest.TestCase):
+
+    def test_cprofile_implies_profile(self):
+        self.assertTrue(parse_args(['--cprofile', 'out.prof']).profile)
+        self.assertTrue(parse_args(['--profile-heap']).profile)
+        self.assertFalse(parse_args([]).profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
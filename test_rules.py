@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则文件测试
+格式错误的规则文件在加载时抛出 RulesError（指出出错的分类），不会留到构建匹配器时才出错；
+规则缓存只在私有目录中读写，损坏的缓存文件当作未命中。
+    python -m unittest test_rules      或     python -m pytest test_rules.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from classification_rules import RuleSet, RulesError
+
+
+def rules_with(spec):
+    return {'categories': {'A': spec, 'B': ['b']}}
+
+
+class RuleValidationTest(unittest.TestCase):
+
+    def test_valid_rules(self):
+        rules = RuleSet.from_dict(rules_with({'priority': 2, 'icon': '🤖', 'keywords': ['a', {'aa': 0.5}]}))
+        self.assertEqual(rules.categories, {'A': ['a', 'aa'], 'B': ['b']})
+        self.assertEqual(rules.weights, {'A': {'aa': 0.5}})
+        self.assertEqual(rules.priorities, {'A': 2})
+        self.assertEqual(rules.icons, {'A': '🤖'})
+        rules.build('token')
+
+    def test_priority_must_be_number(self):
+        for priority in ('high', True, [1], {'x': 1}):
+            with self.assertRaisesRegex(RulesError, "'A'"):
+                RuleSet.from_dict(rules_with({'priority': priority, 'keywords': ['a']}))
+        for priority in (None, 0, 1, -1, 1.5):
+            RuleSet.from_dict(rules_with({'priority': priority, 'keywords': ['a']})).build('substring')
+
+    def test_weight_must_be_number(self):
+        for weight in ('2', False, None):
+            with self.assertRaisesRegex(RulesError, "'A'"):
+                RuleSet.from_dict(rules_with({'keywords': [{'a': weight}]}))
+
+    def test_missing_keywords(self):
+        for data in ({}, {'categories': []}, rules_with({'icon': 'x'}), rules_with('a')):
+            with self.assertRaises(RulesError):
+                RuleSet.from_dict(data)
+
+
+class RulesCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rules_file = os.path.join(self.tmp.name, 'rules.json')
+        with open(self.rules_file, 'w', encoding='utf-8') as f:
+            json.dump(rules_with({'priority': 2, 'keywords': ['a', {'aa': 0.5}]}), f)
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+
+    def cache_files(self):
+        return sorted(os.listdir(self.cache_dir))
+
+    def test_cache_hit(self):
+        rules = RuleSet.from_file(self.rules_file, self.cache_dir)
+        rules.compile('token', self.cache_dir)
+        self.assertFalse(rules.loaded_from_cache)
+        self.assertEqual([name.rsplit('.', 1)[1] for name in self.cache_files()], ['pickle', 'json'])
+
+        cached = RuleSet.from_file(self.rules_file, self.cache_dir)
+        self.assertEqual((cached.categories, cached.weights, cached.priorities), ({'A': ['a', 'aa'], 'B': ['b']},
+                                                                                 {'A': {'aa': 0.5}}, {'A': 2}))
+        cached.compile('token', self.cache_dir)
+        self.assertTrue(cached.loaded_from_cache)
+
+    def test_corrupt_cache_is_a_miss(self):
+        RuleSet.from_file(self.rules_file, self.cache_dir).compile('substring', self.cache_dir)
+        for name in self.cache_files():
+            with open(os.path.join(self.cache_dir, name), 'wb') as f:
+                f.write(b'\x80\x04garbage')
+        rules = RuleSet.from_file(self.rules_file, self.cache_dir)
+        self.assertEqual(rules.priorities, {'A': 2})
+        rules.compile('substring', self.cache_dir)
+        self.assertFalse(rules.loaded_from_cache)
+
+    @unittest.skipUnless(os.name == 'posix', 'POSIX 权限检查')
+    def test_shared_cache_dir_is_ignored(self):
+        os.makedirs(self.cache_dir)
+        os.chmod(self.cache_dir, 0o777)
+        rules = RuleSet.from_file(self.rules_file, self.cache_dir)
+        rules.compile('token', self.cache_dir)
+        rules.compile('token', self.cache_dir)
+        self.assertFalse(rules.loaded_from_cache)
+        self.assertEqual(self.cache_files(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书签快照往返测试
+write_snapshot 保存后由 BookmarkSnapshot 加载，分类顺序、书签顺序和全部字段必须与保存前完全一致；
+损坏、截断或版本不符的文件必须抛出 SnapshotError。
+    python -m unittest test_snapshot      或     python -m pytest test_snapshot.py
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from bookmark_record import Bookmark
+from bookmark_snapshot import (FLAG_NUL_SEPARATED, FORMAT_VERSION, MAGIC, BookmarkSnapshot, SnapshotError,
+                               write_snapshot)
+
+
+def make_classified():
+    dev = ('Bookmarks bar', 'Dev & Tools')
+    study = ('Bookmarks bar', 'Dev & Tools', '学习资料')
+    return {
+        'Programming': [
+            Bookmark('https://github.com/a', 'GitHub A', '1600000001', dev),
+            Bookmark('https://stackoverflow.com/q/1', 'Q 1', '1600000002', dev, 'data:image/png;base64,AAAA'),
+        ],
+        'Python': [
+            Bookmark('https://docs.python.org/3/', 'Python 文档', '1600000003', study),
+        ],
+        'Other': [
+            Bookmark('https://example.org/', 'Example', '', ()),
+        ],
+    }
+
+
+def bookmark_fields(bookmark):
+    return (bookmark.url, bookmark.name, bookmark.add_date, bookmark.folder_path, bookmark.icon,
+            bookmark.duplicate_paths)
+
+
+class SnapshotRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'bookmarks.snapshot')
+
+    def round_trip(self, classified, rules_version='v1'):
+        write_snapshot(self.path, classified, rules_version)
+        with BookmarkSnapshot(self.path) as snapshot:
+            loaded = snapshot.classified()
+            flat = [snapshot[i] for i in range(len(snapshot))]
+            categories = [snapshot.category(i) for i in range(len(snapshot))]
+            return snapshot.flags, snapshot.rules_version, loaded, flat, categories
+
+    def assert_same(self, classified, loaded):
+        self.assertEqual(list(loaded), list(classified))
+        for name, items in classified.items():
+            self.assertEqual([bookmark_fields(b) for b in loaded[name]], [bookmark_fields(b) for b in items])
+
+    def test_round_trip(self):
+        classified = make_classified()
+        flags, version, loaded, flat, categories = self.round_trip(classified, 'rules-abc')
+        self.assertTrue(flags & FLAG_NUL_SEPARATED)
+        self.assertEqual(version, 'rules-abc')
+        self.assert_same(classified, loaded)
+        expected = [b for items in classified.values() for b in items]
+        self.assertEqual([bookmark_fields(b) for b in flat], [bookmark_fields(b) for b in expected])
+        self.assertEqual(categories, [name for name, items in classified.items() for _ in items])
+        with BookmarkSnapshot(self.path) as snapshot:
+            self.assertEqual(bookmark_fields(snapshot[-1]), bookmark_fields(expected[-1]))
+            with self.assertRaises(IndexError):
+                snapshot[len(expected)]
+
+    def test_no_rules_version(self):
+        _, version, _, _, _ = self.round_trip(make_classified(), None)
+        self.assertIsNone(version)
+
+    def test_duplicate_paths(self):
+        classified = make_classified()
+        bookmark = classified['Programming'][0]
+        bookmark.duplicate_paths = (('Imported', 'Duplicates'), bookmark.folder_path, ())
+        _, _, loaded, flat, _ = self.round_trip(classified)
+        self.assert_same(classified, loaded)
+        self.assertEqual(flat[0].duplicate_paths, (('Imported', 'Duplicates'), bookmark.folder_path, ()))
+        self.assertEqual(flat[1].duplicate_paths, ())
+
+    def test_string_with_nul(self):
+        # 字符串含 NUL 时不能以 NUL 分隔，改为按偏移读取
+        classified = make_classified()
+        classified['Other'].append(Bookmark('https://nul.example/', 'a\0b', '1600000009', ('x\0y',)))
+        flags, _, loaded, flat, _ = self.round_trip(classified)
+        self.assertFalse(flags & FLAG_NUL_SEPARATED)
+        self.assert_same(classified, loaded)
+        self.assertEqual(flat[-1].name, 'a\0b')
+        self.assertEqual(flat[-1].folder_path, ('x\0y',))
+
+    def test_empty_snapshot(self):
+        for classified in ({}, {'Other': []}):
+            _, version, loaded, flat, _ = self.round_trip(classified)
+            self.assertEqual(version, 'v1')
+            self.assertEqual(list(loaded), list(classified))
+            self.assertEqual(flat, [])
+
+    def test_truncated_file(self):
+        write_snapshot(self.path, make_classified(), 'v1')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for size in (0, 10, len(data) // 2, len(data) - 8):
+            with open(self.path, 'wb') as f:
+                f.write(data[:size])
+            with self.assertRaises(SnapshotError, msg=f'{size} 字节'):
+                BookmarkSnapshot(self.path)
+
+    def test_bad_magic_and_version(self):
+        write_snapshot(self.path, make_classified(), 'v1')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for patched in (b'NOTSNAP!' + data[len(MAGIC):],
+                        data[:len(MAGIC)] + struct.pack('<H', FORMAT_VERSION + 1) + data[len(MAGIC) + 2:]):
+            with open(self.path, 'wb') as f:
+                f.write(patched)
+            with self.assertRaises(SnapshotError):
+                BookmarkSnapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计模式测试
+stats（run_stats / count_categories）边读边去重、分类，各分类的书签数必须与完整流程
+（parse_and_classify）分类后的结果一致；统计模式不加载缓存、剖析、快照、搜索索引和输出清单模块。
+    python -m unittest test_stats      或     python -m pytest test_stats.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from bookmark_classifier import BookmarkClassifier, parse_and_classify, parse_args, run_stats
+from profiler import PipelineProfiler
+
+EXPORT = '''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1600000000">Python 学习</H3>
+    <DL><p>
+        <DT><A HREF="https://docs.python.org/3/" ADD_DATE="1600000001">Python 文档</A>
+        <DT><A HREF="https://github.com/psf/requests" ADD_DATE="1600000002">requests</A>
+        <DT><A HREF="https://example.org/notes" ADD_DATE="1600000003">笔记</A>
+    </DL><p>
+    <DT><A HREF="https://github.com/psf/requests" ADD_DATE="1600000004">requests（重复）</A>
+    <DT><A HREF="https://chat.openai.com/" ADD_DATE="1600000005">ChatGPT</A>
+    <DT><A HREF="https://www.bilibili.com/video/1" ADD_DATE="1600000006">视频</A>
+    <DT><A HREF="https://docs.python.org/3/" ADD_DATE="1600000007">Python 文档（重复）</A>
+    <DT><A HREF="https://stackoverflow.com/q/1" ADD_DATE="1600000008">Q 1</A>
+</DL><p>
+'''
+
+# 统计模式不应导入的模块
+HEAVY_MODULES = ('classification_cache', 'profiler', 'output_manifest', 'bookmark_snapshot',
+                 'search_index', 'pickle', 'tracemalloc', 'mmap', 'sqlite3')
+
+
+class StatsCountsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.input_file = os.path.join(self.tmp.name, 'bookmarks.html')
+        with open(self.input_file, 'w', encoding='utf-8') as f:
+            f.write(EXPORT)
+
+    def pipeline_counts(self, *options):
+        args = parse_args(['--input', self.input_file, '--no-cache', *options])
+        rules = BookmarkClassifier.load_rules(None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, classified, _ = parse_and_classify(args, self.input_file, rules, None, PipelineProfiler())
+        return {name: len(items) for name, items in classified.items() if items}
+
+    def stats_counts(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            counts = run_stats(self.input_file, as_json=True, **options)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['categories'], dict(counts))
+        return report, dict(counts)
+
+    def test_counts_match_pipeline(self):
+        report, counts = self.stats_counts()
+        self.assertEqual(counts, self.pipeline_counts())
+        self.assertEqual((report['bookmarks'], report['duplicates']), (8, 2))
+        self.assertEqual(sum(counts.values()), 6)
+
+    def test_counts_match_pipeline_without_dedup(self):
+        _, counts = self.stats_counts(dedup=False)
+        self.assertEqual(counts, self.pipeline_counts('--no-dedup'))
+        self.assertEqual(sum(counts.values()), 8)
+
+    def test_counts_match_pipeline_with_folder_scoring(self):
+        _, counts = self.stats_counts(folder_weight=0.5)
+        self.assertEqual(counts, self.pipeline_counts('--folder-scoring', '0.5'))
+
+    def test_stats_skips_output_modules(self):
+        code = ('import sys, bookmark_cli; bookmark_cli.main(["stats", "--json", "--input", sys.argv[1]]); '
+                f'print([m for m in {HEAVY_MODULES!r} if m in sys.modules])')
+        result = subprocess.run([sys.executable, '-c', code, self.input_file], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        self.assertEqual(result.stdout.splitlines()[-1], '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()